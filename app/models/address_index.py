@@ -0,0 +1,103 @@
+import bisect
+import threading
+
+
+def _amount(tx):
+    """Amount a balance scan adds for tx, or None if it is not a number"""
+    amount = tx.get("amount", 0)
+    return amount if isinstance(amount, (int, float)) else None
+
+
+class BalanceIndex:
+    """Address -> balance of the mined blocks, updated block by block.
+
+    Amounts are applied in chain order, receiver before sender, exactly as a
+    scan of every block would add them, so lookups return the same values
+    (floats included) in O(1).
+    """
+    def __init__(self):
+        self._balances = {}
+        self._lock = threading.Lock()
+
+    def balance(self, address):
+        return self._balances.get(address, 0)
+
+    def balances(self, addresses) -> dict:
+        return {address: self._balances.get(address, 0) for address in addresses}
+
+    def apply_block(self, block):
+        with self._lock:
+            self._apply(self._balances, block)
+
+    def rebuild(self, chain):
+        """Recompute every balance from chain (after a replaced chain)"""
+        balances = {}
+        for block in chain:
+            self._apply(balances, block)
+        with self._lock:
+            self._balances = balances
+
+    @staticmethod
+    def _apply(balances, block):
+        for tx in block.transactions:
+            if not isinstance(tx, dict):
+                continue
+            amount = _amount(tx)
+            if amount is None:
+                continue
+            receiver, sender = tx.get("receiver_address"), tx.get("sender_address")
+            if isinstance(receiver, str):
+                balances[receiver] = balances.get(receiver, 0) + amount
+            if isinstance(sender, str):
+                balances[sender] = balances.get(sender, 0) - amount
+
+
+class TransactionHistory:
+    """Address -> (block height, position in block) of every mined
+    transaction it sends or receives, oldest first.
+
+    Updated as blocks are appended; pages are read newest first from a
+    cursor, the location of the last transaction of the previous page.
+    The indexed chain is kept with the locations, so a page and its blocks
+    can be read together while the chain is being replaced.
+    """
+    def __init__(self):
+        self._locations = {}
+        self._chain = []
+        self._lock = threading.Lock()
+
+    def count(self, address) -> int:
+        return len(self._locations.get(address, ()))
+
+    def page_blocks(self, address, limit, before=None):
+        """Up to limit locations, newest first and older than `before` if
+        given, each paired with its block, plus the address total; all
+        read from the same indexed chain"""
+        with self._lock:
+            locations = self._locations.get(address, [])
+            end = len(locations) if before is None else bisect.bisect_left(locations, before)
+            page = locations[max(0, end - limit):end][::-1]
+            return [(location, self._chain[location[0]]) for location in page], len(locations)
+
+    def apply_block(self, height, block):
+        with self._lock:
+            self._apply(self._locations, height, block)
+
+    def rebuild(self, chain):
+        """Re-index every block of chain (after a replaced chain)"""
+        locations = {}
+        for height, block in enumerate(chain):
+            self._apply(locations, height, block)
+        with self._lock:
+            self._locations = locations
+            self._chain = chain
+
+    @staticmethod
+    def _apply(locations, height, block):
+        for position, tx in enumerate(block.transactions):
+            if not isinstance(tx, dict):
+                continue
+            receiver, sender = tx.get("receiver_address"), tx.get("sender_address")
+            for address in {receiver, sender}:
+                if isinstance(address, str):
+                    locations.setdefault(address, []).append((height, position))
@@ -1,29 +1,201 @@
-from .util import timestamp, hash_dict
+from .util import timestamp, hash_dict, hash_dicts
+from .merkle import MerkleTree
+from .transaction import transaction_id
+from .difficulty import bits_to_target, target_from_zeros, target_to_bits, target_to_difficulty
+from . import hash_backends
+import json
+import struct
+
+# Placeholder used to locate the nonce inside the serialized block
+_NONCE_MARKER = "__nonce__"
+
+# Block versions:
+#   1 - legacy: hash of the JSON dump of the whole block (chains saved before
+#       binary headers existed load as version 1 and keep verifying)
+#   2 - hash of the fixed-size binary header below, difficulty is a number
+#       of leading hex zeros
+#   3 - same header, the difficulty field holds the compact target ("bits")
+LEGACY_VERSION = 1
+HEADER_VERSION = 2
+TARGET_VERSION = 3
+# Leading hex zeros every block before version 3 was mined with at least
+# (the base difficulty of those chains)
+LEGACY_MIN_DIFFICULTY = 3
+
+# version, index, previous hash, Merkle root, timestamp, difficulty/bits, nonce.
+# The nonce is last so mining only re-hashes the final 64-byte chunk.
+_HEADER = struct.Struct(">IQ32s32sQIQ")
+HEADER_SIZE = _HEADER.size  # 96 bytes
+_NONCE_SIZE = 8
+
+
+def _nonce_decimal(nonce):
+    return str(nonce).encode()
+
+def _nonce_u64(nonce):
+    return nonce.to_bytes(_NONCE_SIZE, 'big')
+
+def nonce_encoder(version):
+    """Function that turns a nonce into the bytes placed between the
+    mining_message_parts() prefix and suffix for a block version"""
+    return _nonce_u64 if version >= HEADER_VERSION else _nonce_decimal
+
 
 class Block:
-    def __init__(self, index, transactions, previous_hash, nonce=0, mining_time=None, difficulty=None):
+    def __init__(self, index, transactions, previous_hash, nonce=0, mining_time=None, difficulty=None, version=TARGET_VERSION, bits=None, merkle_tree=None):
+        self.version = version
         self.index = index
         self.transactions = transactions
+        if merkle_tree is not None:
+            self._merkle_tree = merkle_tree  # Already built over these transactions
         self.timestamp = timestamp()
         self.previous_hash = previous_hash
         self.nonce = nonce
         self.mining_time = mining_time  # Time in seconds to mine this block
         self.difficulty = difficulty  # Difficulty level when block was mined
+        if version >= TARGET_VERSION:
+            # Compact target; a difficulty given instead is read as leading zeros
+            if bits is None:
+                bits = target_to_bits(target_from_zeros(difficulty or 0))
+            self.bits = bits
+            if isinstance(bits, int):
+                self.difficulty = target_to_difficulty(bits_to_target(bits))
 
-    def compute_hash(self):
+    @property
+    def target(self) -> int:
+        """Largest valid hash as an integer.
+
+        Version 3 blocks carry it in bits; older blocks require `difficulty`
+        leading hex zeros, and never fewer than LEGACY_MIN_DIFFICULTY.
+        """
+        if self.version >= TARGET_VERSION:
+            return bits_to_target(self.bits)
+        return target_from_zeros(max(self.difficulty or 0, LEGACY_MIN_DIFFICULTY))
+
+    @property
+    def transactions(self):
+        return self._transactions
+
+    @transactions.setter
+    def transactions(self, transactions):
+        self._transactions = transactions
+        self._merkle_tree = None
+
+    @property
+    def merkle_tree(self) -> MerkleTree:
+        """Merkle tree of the transaction ids, built once per block"""
+        if self._merkle_tree is None:
+            leaves = [bytes.fromhex(transaction_id(tx)) for tx in self.transactions]
+            self._merkle_tree = MerkleTree(leaves)
+        return self._merkle_tree
+
+    @property
+    def merkle_root(self) -> bytes:
+        return self.merkle_tree.root
+
+    def has_duplicate_transactions(self) -> bool:
+        """Whether two transactions of the block share an id.
+
+        The Merkle tree pairs the last node of an odd level with itself, so
+        repeating the trailing transactions keeps the same root and header
+        hash (CVE-2012-2459); blocks with duplicates are therefore invalid.
+        """
+        leaves = self.merkle_tree.leaves
+        return len(set(leaves)) != len(leaves)
+
+    def merkle_proof(self, txid: str):
+        """Inclusion proof for a transaction id, or None if not in this block.
+
+        Returns (position, proof) where proof is a MerkleTree.proof list.
+        """
+        position = self.merkle_tree.position(bytes.fromhex(txid))
+        if position is None:
+            return None
+        return position, self.merkle_tree.proof(position)
+
+    def _hash_data(self, nonce):
         # Only hash the core block data, not mining_time or difficulty
-        hash_data = {
+        return {
             'index': self.index,
             'transactions': self.transactions,
             'timestamp': self.timestamp,
             'previous_hash': self.previous_hash,
-            'nonce': self.nonce
+            'nonce': nonce
         }
-        return hash_dict(hash_data)
-    
+
+    def header(self, nonce=None) -> bytes:
+        """Fixed-size binary header hashed by version 2 blocks.
+
+        Raises ValueError if previous_hash is not a hex hash or a version 3
+        block has no bits.
+        """
+        previous_hash = bytes.fromhex(self.previous_hash.rjust(64, '0'))
+        if len(previous_hash) != 32:
+            raise ValueError(f"invalid previous_hash: {self.previous_hash}")
+        if self.version >= TARGET_VERSION:
+            if not isinstance(self.bits, int) or not 0 <= self.bits < 1 << 32:
+                raise ValueError(f"invalid bits: {self.bits}")
+            difficulty = self.bits
+        else:
+            difficulty = self.difficulty or 0
+        return _HEADER.pack(
+            self.version,
+            self.index,
+            previous_hash,
+            self.merkle_root,
+            int(self.timestamp),
+            difficulty,
+            self.nonce if nonce is None else nonce
+        )
+
+    def compute_hash(self):
+        if self.version >= HEADER_VERSION:
+            return hash_backends.sha256(self.header()).hex()
+        return hash_dict(self._hash_data(self.nonce))
+
+    @staticmethod
+    def compute_hashes(blocks):
+        """Compute the hash of many blocks in one batch (same as compute_hash)"""
+        hashes = [None] * len(blocks)
+        legacy = [i for i, block in enumerate(blocks) if block.version < HEADER_VERSION]
+        headers = [i for i, block in enumerate(blocks) if block.version >= HEADER_VERSION]
+
+        for i, digest in zip(legacy, hash_dicts([blocks[i]._hash_data(blocks[i].nonce) for i in legacy])):
+            hashes[i] = digest
+        # Headers all have the same size, so they are compressed together.
+        # A block whose header cannot be built keeps None (never a valid hash)
+        encoded = []
+        for i in headers:
+            try:
+                encoded.append((i, blocks[i].header()))
+            except ValueError:
+                pass
+        digests = hash_backends.sha256_batch([header for _, header in encoded])
+        for (i, _), digest in zip(encoded, digests):
+            hashes[i] = digest.hex()
+        return hashes
+
+    def mining_message_parts(self):
+        """Split the message hashed by compute_hash() around the nonce.
+
+        Returns (prefix, suffix) bytes such that
+        prefix + nonce_encoder(version)(nonce) + suffix is exactly what
+        compute_hash() feeds to SHA-256, so the block is serialized once
+        per mining run instead of once per nonce. For header blocks the
+        suffix is empty and the prefix covers the first 88 header bytes.
+        """
+        if self.version >= HEADER_VERSION:
+            return self.header(nonce=0)[:-_NONCE_SIZE], b''
+        encoded = json.dumps(self._hash_data(_NONCE_MARKER), sort_keys=True)
+        # Keys are sorted, so only 'index' (an int) precedes the nonce and the
+        # first occurrence of the marker is always the nonce value itself
+        prefix, suffix = encoded.split(json.dumps(_NONCE_MARKER), 1)
+        return prefix.encode(), suffix.encode()
+
     def to_dict(self):
         """Convert block to dictionary for JSON serialization"""
-        return {
+        data = {
+            'version': self.version,
             'index': self.index,
             'transactions': self.transactions,
             'timestamp': self.timestamp,
@@ -33,21 +205,33 @@ class Block:
             'mining_time': self.mining_time,
             'difficulty': self.difficulty
         }
-    
+        if self.version >= HEADER_VERSION:
+            data['merkle_root'] = self.merkle_root.hex()
+        if self.version >= TARGET_VERSION:
+            data['bits'] = self.bits
+        return data
+
     @classmethod
     def from_dict(cls, data):
-        """Create block from dictionary (deserialization)"""
+        """Create block from dictionary (deserialization)
+
+        Blocks saved without a 'version' are legacy (version 1) blocks. The
+        difficulty of version 3 blocks is derived from their bits.
+        """
+        version = data.get('version', LEGACY_VERSION)
         block = cls(
             index=data['index'],
             transactions=data['transactions'],
             previous_hash=data['previous_hash'],
             nonce=data['nonce'],
             mining_time=data.get('mining_time'),
-            difficulty=data.get('difficulty')
+            difficulty=None if version >= TARGET_VERSION else data.get('difficulty'),
+            version=version,
+            bits=data.get('bits')
         )
         # Restore original timestamp
         block.timestamp = data['timestamp']
         # Restore hash if present
         if 'hash' in data and data['hash']:
             block.hash = data['hash']
-        return block
\ No newline at end of file
+        return block
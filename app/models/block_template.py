@@ -0,0 +1,90 @@
+from .block import Block
+from .merkle import MerkleTree
+from .transaction import transaction_id
+
+
+def coinbase_transaction(miner_address, amount):
+    """Transaction paying the mining reward, placed first in a block"""
+    return {
+        "sender_address": "COINBASE",
+        "sender_pubkey": None,
+        "receiver_address": miner_address,
+        "amount": amount,
+        "signature": None
+    }
+
+
+class BlockTemplate:
+    """Block to mine on top of previous_block, kept warm between mining runs.
+
+    Transaction ids (the Merkle leaves, i.e. the serialized transaction
+    section of the header) come from the mempool, which computes them once
+    per transaction, so build() only has to hash the coinbase and the
+    Merkle levels.
+
+    The template takes the oldest pending transactions, in mempool order,
+    until the next one would exceed max_transactions or max_bytes
+    (serialized size, not counting the coinbase); later ones wait for the
+    next block.
+    """
+    def __init__(self, previous_block, bits, max_transactions=None, max_bytes=None):
+        self.previous_block = previous_block
+        self.index = previous_block.index + 1
+        self.previous_hash = previous_block.hash
+        self.bits = bits
+        self.max_transactions = max_transactions
+        self.max_bytes = max_bytes
+        self.transactions = []
+        self.leaves = []
+        self.bytes = 0
+        self.full = False
+        self._source = None
+        self._generation = None
+        self._tree = None  # MerkleTree of the last build
+
+    def sync(self, mempool):
+        """Bring the transaction section in line with the mempool.
+
+        Transactions added since the last sync are appended while they fit;
+        after any removal the section is re-read from the mempool.
+        """
+        if mempool is not self._source or mempool.generation != self._generation:
+            self._source = mempool
+            self._generation = mempool.generation
+            self.transactions = []
+            self.leaves = []
+            self.bytes = 0
+            self.full = False
+        if self.full:
+            return
+        # One more than the room left, to find out whether the block is full
+        limit = None if self.max_transactions is None else self.max_transactions - len(self.transactions) + 1
+        for txid, tx, size in mempool.items_since(len(self.transactions), limit):
+            if ((self.max_transactions is not None and len(self.transactions) >= self.max_transactions)
+                    or (self.max_bytes is not None and self.bytes + size > self.max_bytes)):
+                self.full = True
+                break
+            self.transactions.append(tx)
+            self.leaves.append(bytes.fromhex(txid))
+            self.bytes += size
+
+    def build(self, coinbase=None) -> Block:
+        """Block with the coinbase (optional) followed by the pending transactions"""
+        transactions = list(self.transactions)
+        leaves = list(self.leaves)
+        if coinbase is not None:
+            transactions.insert(0, coinbase)
+            leaves.insert(0, bytes.fromhex(transaction_id(coinbase)))
+        if self._tree is None or self._tree.leaves != leaves:
+            self._tree = MerkleTree(leaves)
+        block = Block(
+            index=self.index,
+            transactions=transactions,
+            previous_hash=self.previous_hash,
+            bits=self.bits,
+            merkle_tree=self._tree
+        )
+        # A previous block from a peer may be dated slightly ahead of this
+        # clock; timestamps must not go back
+        block.timestamp = max(block.timestamp, int(self.previous_block.timestamp))
+        return block
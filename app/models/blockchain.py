@@ -1,16 +1,78 @@
-from .block import Block
-from .transaction import Transaction
+from .block import Block, nonce_encoder, HEADER_VERSION, TARGET_VERSION
+from .block_template import BlockTemplate, coinbase_transaction
+from .mempool import Mempool, MempoolFull, SeenTransactions, transaction_size
+from .address_index import BalanceIndex, TransactionHistory
+from .difficulty import (bits_to_target, hash_meets_target, retarget,
+                         target_from_zeros, target_to_bits, target_to_difficulty)
+from .transaction import Transaction, normalized_transaction, transaction_id
 from .util import timestamp
+from . import hash_backends
+from .miner import scan_nonces, mine_parallel
+import multiprocessing
+import threading
 import time
 
+
+class MiningCancelled(Exception):
+    """Raised by proof_of_work when its should_stop callback asks it to stop"""
+
+
+# Blockchain attributes read by the validation checks, copied into the
+# processes of a parallel validation
+_VALIDATION_SETTINGS = ("BASE_DIFFICULTY", "MIN_DIFFICULTY", "BLOCK_INTERVAL",
+                        "RETARGET_WINDOW", "MAX_RETARGET_FACTOR", "MAX_FUTURE_BLOCK_TIME",
+                        "MAX_BLOCK_TRANSACTIONS", "MAX_BLOCK_BYTES")
+
+
+def _validate_shard(settings, backend, blocks, start):
+    """Errors of blocks[start:] in a validation worker process"""
+    hash_backends.set_backend(backend)
+    checker = Blockchain()
+    for name, value in settings.items():
+        setattr(checker, name, value)
+    return checker._check_blocks(blocks, start, len(blocks))
+
+
 class Blockchain:
 
-    BASE_DIFFICULTY = 3
-    DIFFICULTY_INCREMENT_INTERVAL = 1000  # Increase difficulty every 1000 blocks
+    BASE_DIFFICULTY = 3  # Leading hex zeros required until the first retarget
+    MIN_DIFFICULTY = 1  # Retargeting never goes easier than this
+    BLOCK_INTERVAL = 10  # Wanted mining time per block, in seconds
+    RETARGET_WINDOW = 10  # Blocks averaged by each retarget
+    MAX_RETARGET_FACTOR = 4  # Largest target change per block
+    MAX_FUTURE_BLOCK_TIME = 60  # Seconds a block timestamp may be ahead of the local clock
+    # Nonces hashed per sha256_batch call while mining, when the hash backend
+    # batches efficiently (otherwise nonces are tried one at a time)
+    MINING_BATCH_SIZE = 1024
+    # Fewer blocks than this are validated in-process: starting the pool
+    # costs more than hashing them
+    PARALLEL_VALIDATION_MIN_BLOCKS = 200
+    # Blocks checked between two progress records of validate_chain_stream
+    VALIDATION_BATCH_SIZE = 100
+    # Recent transaction ids remembered to drop gossip echoes
+    SEEN_TRANSACTIONS_SIZE = 65536
+    # Transactions per block besides the coinbase, and their serialized size.
+    # Blocks over these are invalid, so every node must use the same values
+    MAX_BLOCK_TRANSACTIONS = 500
+    MAX_BLOCK_BYTES = 250_000
+    # Local limits of the blocks this node mines, capped by the ones above
+    TEMPLATE_MAX_TRANSACTIONS = MAX_BLOCK_TRANSACTIONS
+    TEMPLATE_MAX_BYTES = MAX_BLOCK_BYTES
+    # Pending transactions kept at most; new ones are rejected past this
+    MAX_MEMPOOL_TRANSACTIONS = 10_000
+    MAX_MEMPOOL_BYTES = 5_000_000
 
     def __init__(self):
-        self.unconfirmed_transactions = []
-        self.chain = []
+        self.mempool = Mempool(self.MAX_MEMPOOL_TRANSACTIONS, self.MAX_MEMPOOL_BYTES)
+        self.seen_transactions = SeenTransactions(self.SEEN_TRANSACTIONS_SIZE)
+        self.balances = BalanceIndex()
+        self.history = TransactionHistory()
+        # Held while the chain and its indexes change: the mining thread and
+        # peer blocks or syncs may add or replace blocks at the same time
+        self._chain_lock = threading.RLock()
+        self.chain = []  # Also clears self.checkpoint and the address indexes
+        self.last_mining_stats = None
+        self._template = None
         # Try to load existing blockchain, otherwise create genesis
         self.create_genesis_block()
 
@@ -19,29 +81,139 @@ class Blockchain:
         genesis_block.hash = genesis_block.compute_hash()
         self.chain.append(genesis_block)
 
+    @property
+    def unconfirmed_transactions(self):
+        """Pending transactions in arrival order (a copy of the mempool)"""
+        return self.mempool.transactions()
+
+    @unconfirmed_transactions.setter
+    def unconfirmed_transactions(self, transactions):
+        self.mempool.replace(transactions)
+        self.seen_transactions.update(txid for txid, _, _ in self.mempool.items_since(0))
+
+    @property
+    def chain(self):
+        return self._chain
+
+    @chain.setter
+    def chain(self, chain):
+        with self._chain_lock:
+            self._chain = chain
+            # A replaced chain (sync, load from disk) must be validated again
+            self.checkpoint = None
+            self.balances.rebuild(chain)
+            self.history.rebuild(chain)
+
+    def restore_checkpoint(self, checkpoint):
+        """Reuse a validation checkpoint saved for this chain.
+
+        Ignored unless the chain still has a block at the checkpoint height
+        with the checkpoint hash. Returns True if the checkpoint was restored.
+        """
+        try:
+            height, block_hash = checkpoint["height"], checkpoint["hash"]
+            if 0 <= height < len(self.chain) and self.chain[height].hash == block_hash:
+                self.checkpoint = {"height": height, "hash": block_hash}
+                return True
+        except (TypeError, KeyError, AttributeError):
+            pass
+        return False
+
+    def _checkpoint_start(self):
+        """Index of the first block above a still matching checkpoint, else 0"""
+        checkpoint = self.checkpoint
+        if checkpoint is None:
+            return 0
+        height = checkpoint["height"]
+        if height < len(self.chain) and getattr(self.chain[height], 'hash', None) == checkpoint["hash"]:
+            return height + 1
+        self.checkpoint = None
+        return 0
+
     @property
     def last_block(self):
         return self.chain[-1]
     
+    def next_bits(self, blocks=None):
+        """Compact target required for the block following `blocks`.
+
+        Retargets on every block from the last RETARGET_WINDOW mined blocks:
+        their average target is scaled by the timestamp gaps that led to them
+        (the gap after genesis excluded) against BLOCK_INTERVAL each. Only
+        header fields are read, since they are what the proof of work
+        commits to; mining_time is informative only and can be altered
+        without changing a block hash. Gaps also count idle time between
+        on-demand mining runs, which makes the next blocks easier.
+
+        Args:
+            blocks: Chain (or chain prefix) the block extends, default self.chain
+        """
+        if blocks is None:
+            blocks = self.chain
+        blocks = blocks[-(self.RETARGET_WINDOW + 1):]
+        window = [(previous, block) for previous, block in zip(blocks, blocks[1:]) if previous.index > 0]
+        if not window:
+            return target_to_bits(target_from_zeros(self.BASE_DIFFICULTY))
+        target = retarget(
+            [block.target for _, block in window],
+            [max(0, int(block.timestamp) - int(previous.timestamp)) for previous, block in window],
+            self.BLOCK_INTERVAL,
+            self.MAX_RETARGET_FACTOR,
+            target_from_zeros(self.MIN_DIFFICULTY)
+        )
+        return target_to_bits(target)
+
+    def block_template(self):
+        """Template of the next block, synced with the tip and pending transactions.
+
+        Rebuilt when the tip or the template limits change (add_block,
+        load_from_dict or a replaced chain), otherwise only transactions
+        added since the last call are appended.
+        """
+        with self._chain_lock:
+            template = self._template
+            bits = self.next_bits()
+            limits = self.template_limits()
+            if (template is None or template.previous_block is not self.last_block
+                    or (template.max_transactions, template.max_bytes) != limits):
+                template = BlockTemplate(self.last_block, bits, *limits)
+                self._template = template
+            template.bits = bits  # Also follows changes of the retarget settings
+            template.sync(self.mempool)
+            return template
+
+    def template_limits(self):
+        """Transaction count and bytes of the blocks mined here: the
+        TEMPLATE_MAX_* settings, never above the consensus MAX_BLOCK_*"""
+        return (min(self.TEMPLATE_MAX_TRANSACTIONS, self.MAX_BLOCK_TRANSACTIONS),
+                min(self.TEMPLATE_MAX_BYTES, self.MAX_BLOCK_BYTES))
+
     def get_difficulty(self):
-        """Calculate current difficulty based on blockchain length"""
-        total_blocks = len(self.chain)
-        return self.BASE_DIFFICULTY + (total_blocks // self.DIFFICULTY_INCREMENT_INTERVAL)
-    
-    def blocks_until_next_difficulty(self):
-        """Calculate how many blocks until next difficulty increase"""
-        total_blocks = len(self.chain)
-        return self.DIFFICULTY_INCREMENT_INTERVAL - (total_blocks % self.DIFFICULTY_INCREMENT_INTERVAL)
+        """Difficulty of the next block, in equivalent leading hex zeros"""
+        return target_to_difficulty(bits_to_target(self.next_bits()))
     
     @staticmethod
-    def is_valid_proof(block, block_hash, difficulty):
-        return (block_hash.startswith('0' * difficulty) and block_hash == block.compute_hash())
+    def is_valid_proof(block, block_hash):
+        try:
+            return hash_meets_target(block_hash, block.target) and block_hash == block.compute_hash()
+        except (ValueError, TypeError):
+            # Malformed header fields (e.g. a previous_hash that is not hex)
+            return False
     
     @staticmethod
     def valid_block(block, block_hash):
-        return (block_hash == block.compute_hash())
+        try:
+            return (block_hash == block.compute_hash())
+        except ValueError:
+            return False
     
-    def load_from_dict(self, data: dict):
+    def load_from_dict(self, data: dict, validate=False, workers=1):
+        """Replace the chain with the blocks of a to_dict() payload.
+
+        With validate set the new chain is fully checked first (see
+        chain_errors, across `workers` processes) and ValueError is raised,
+        keeping the current chain, if it is invalid.
+        """
         # Expect a dict with a 'chain' key containing a list of block dicts
         if not isinstance(data, dict):
             raise ValueError("data must be a dict")
@@ -55,8 +227,18 @@ class Blockchain:
             block = Block.from_dict(block_data)
             new_chain.append(block)
 
+        if validate:
+            if not new_chain:
+                raise ValueError("chain is empty")
+            errors = self.chain_errors(new_chain, 0, workers)
+            if errors:
+                raise ValueError(f"invalid chain ({len(errors)} errors): {errors[0]}")
+
         # Replace local chain only after successful reconstruction
-        self.chain = new_chain
+        with self._chain_lock:
+            self.chain = new_chain
+            if validate:
+                self.checkpoint = {"height": len(new_chain) - 1, "hash": new_chain[-1].hash}
     
     def to_dict(self):
         return {
@@ -64,49 +246,181 @@ class Blockchain:
         }
     
     def add_block(self, block, proof):
-        previous_hash = self.last_block.hash
+        # The checks and the append must see the same tip
+        with self._chain_lock:
+            previous_hash = self.last_block.hash
 
-        if previous_hash != block.previous_hash:
-            return False
+            if previous_hash != block.previous_hash:
+                return False
+
+            # Legacy versions are only valid in the prefix migrated from before
+            # headers and compact bits; new blocks always carry retargeted bits
+            if block.version < TARGET_VERSION:
+                return False
         
-        if not Blockchain.is_valid_proof(block, proof, block.difficulty):
-            return False
+            if block.bits != self.next_bits():
+                return False
+
+            if self.timestamp_error(block, self.last_block):
+                return False
+
+            if not self.within_block_limits(block):
+                return False
+
+            if block.version >= HEADER_VERSION and block.has_duplicate_transactions():
+                return False
+
+            if not Blockchain.is_valid_proof(block, proof):
+                return False
         
-        block.hash = proof
-        self.chain.append(block)
-        return True
+            block.hash = proof
+            self.chain.append(block)
+            self.balances.apply_block(block)
+            self.history.apply_block(len(self.chain) - 1, block)
+            # Only the transactions this block confirmed leave the mempool, and
+            # late gossip copies of them are dropped
+            txids = [leaf.hex() for leaf in block.merkle_tree.leaves]
+            self.mempool.remove(txids)
+            self.seen_transactions.update(txids)
+            self.block_template()
+            return True
     
-    def proof_of_work(self, block):
-        """Perform proof of work and track mining time"""
+    def timestamp_error(self, block, previous_block):
+        """Why the timestamp of a version 3 block is invalid, or None.
+
+        Retargeting reads timestamps, so they may not go back in time nor
+        run more than MAX_FUTURE_BLOCK_TIME ahead of the local clock.
+        """
+        if block.version < TARGET_VERSION:
+            return None
+        try:
+            if int(block.timestamp) < int(previous_block.timestamp):
+                return f"Block #{block.index} has a timestamp before the previous block"
+            if int(block.timestamp) > timestamp() + self.MAX_FUTURE_BLOCK_TIME:
+                return f"Block #{block.index} has a timestamp in the future"
+        except (TypeError, ValueError):
+            return f"Block #{block.index} has an invalid timestamp"
+        return None
+
+    def within_block_limits(self, block) -> bool:
+        """Whether the transactions of block besides the coinbase fit in
+        MAX_BLOCK_TRANSACTIONS and MAX_BLOCK_BYTES.
+
+        Only a coinbase in first position is exempt; any further COINBASE
+        entry counts like any other transaction.
+        """
+        transactions = block.transactions
+        if transactions and isinstance(transactions[0], dict) and transactions[0].get("sender_address") == "COINBASE":
+            transactions = transactions[1:]
+        return (len(transactions) <= self.MAX_BLOCK_TRANSACTIONS
+                and sum(transaction_size(tx) for tx in transactions) <= self.MAX_BLOCK_BYTES)
+
+    def proof_of_work(self, block, workers=1, should_stop=None):
+        """Perform proof of work and track mining time.
+
+        The block is serialized once; the SHA-256 state of every 64-byte chunk
+        before the nonce is cached and only the remaining chunks are hashed for
+        each attempt. Candidates are hashed MINING_BATCH_SIZE nonces at a time
+        with the backend sha256_batch. The result is identical to
+        block.compute_hash().
+
+        With workers > 1 the nonce space is partitioned across a process pool
+        (see miner.mine_parallel). Per-worker hashrates of the last run are
+        kept in self.last_mining_stats.
+
+        should_stop is an optional callable polled between nonce batches;
+        when it returns a truthy reason, MiningCancelled(reason) is raised.
+        """
         block.nonce = 0
-        difficulty = block.difficulty
+        batch_size = self.MINING_BATCH_SIZE if hash_backends.get_backend().batch_accelerated else 1
         
         start_time = time.time()
-        computed_hash = block.compute_hash()
-        while not computed_hash.startswith('0' * difficulty):
-            block.nonce += 1
-            computed_hash = block.compute_hash()
+        if workers > 1:
+            result = mine_parallel(block, workers, self.MINING_BATCH_SIZE, should_stop)
+            if result is None:
+                raise MiningCancelled(should_stop() or "cancelled")
+            block.nonce = result["nonce"]
+            computed_hash = result["hash"]
+            worker_stats = result["workers"]
+        else:
+            target = block.target
+            prefix, suffix = block.mining_message_parts()
+            midstate = hash_backends.sha256_midstate(prefix)
+            encode_nonce = nonce_encoder(block.version)
+            nonce = 0
+            found = None
+            while found is None:
+                reason = should_stop() if should_stop else None
+                if reason:
+                    raise MiningCancelled(reason)
+                found = scan_nonces(midstate, suffix, target, nonce, batch_size, encode_nonce)
+                nonce += batch_size
+            block.nonce, computed_hash = found
+            elapsed = time.time() - start_time
+            worker_stats = [{
+                "worker": 0,
+                "hashes": nonce,
+                "elapsed": round(elapsed, 2),
+                "hashrate": round(nonce / elapsed, 2) if elapsed else 0
+            }]
         end_time = time.time()
         
+        self.last_mining_stats = {
+            "workers": worker_stats,
+            "hashrate": round(sum(w["hashrate"] for w in worker_stats), 2)
+        }
+        
         # Store mining time in seconds (rounded to 2 decimals)
         block.mining_time = round(end_time - start_time, 2)
         
         return computed_hash
 
-    def add_new_transaction(self, transaction: dict):
+    def add_new_transaction(self, transaction: dict, txid=None):
         """Accept either a Transaction instance or a dict (JSON) representing a transaction.
 
         If a dict is provided, convert it to a Transaction with `Transaction.from_dict`.
         The method verifies the signature before adding to unconfirmed transactions.
         Supports coinbase/faucet transactions (no sender) which skip signature verification.
-        Returns True on success, False on invalid input or failed verification.
+        Signed dicts are reduced to their Transaction fields first (see
+        normalized_transaction). Transactions whose id (txid, computed from
+        the normalized form if not given) was already seen are dropped
+        before any verification.
+        Returns True on success, False on invalid input, failed verification,
+        a transaction already seen or one too large for the blocks mined here.
+        Raises MempoolFull when the mempool has no room for it.
         """
+        try:
+            transaction = normalized_transaction(transaction)
+            txid = txid or transaction_id(transaction)
+            size = transaction_size(transaction)
+        except Exception:
+            return False
+        if size > self.template_limits()[1]:
+            return False  # Could never be mined here
+        if self.seen_transactions.contains(txid):
+            return False
+        # Checked before the signature, so a flood is turned away cheaply
+        self.mempool.check_room(size)
+        # Recorded even if the checks below fail: the same id always fails again
+        if not self.seen_transactions.add(txid):
+            return False
+        try:
+            return self._admit_transaction(transaction, txid, size)
+        except MempoolFull:
+            # Filled up meanwhile; the transaction may be sent again later
+            self.seen_transactions.discard(txid)
+            raise
+
+    def _admit_transaction(self, transaction, txid, size):
+        """Signature check and mempool insertion of add_new_transaction"""
         # Check if this is a coinbase/faucet transaction (no sender)
         if isinstance(transaction, dict):
             sender = transaction.get("sender_address")
             if sender is None or sender == "COINBASE" or sender == "FAUCET":
                 # For coinbase transactions, just add directly
-                self.unconfirmed_transactions.append(transaction)
+                if self.mempool.add(transaction, txid, size) is None:
+                    return False
+                self.block_template()
                 return True
             
             # Convert dict payloads to Transaction objects
@@ -128,39 +442,180 @@ class Blockchain:
         if not veryfy_tx.verify_signature():
             return False
 
-        self.unconfirmed_transactions.append(transaction)
+        if self.mempool.add(transaction, txid, size) is None:
+            return False
+        self.block_template()
         return True
 
-    def validate_chain(self):
-        """Validate the integrity of the entire blockchain.
+    def confirmed_balances(self, addresses) -> dict:
+        """Balances of many addresses from the mined blocks, read from the balance index"""
+        return self.balances.balances(addresses)
+
+    def validate_chain(self, full=False, workers=1):
+        """Validate the integrity of the blockchain.
+        
+        Blocks up to self.checkpoint (the highest block already validated,
+        with its hash) are not checked again; the checkpoint moves to the tip
+        when the chain is valid. Replacing the chain clears it.
+        
+        Args:
+            full: Re-validate every block from genesis, ignoring the checkpoint
+            workers: Number of validation processes (see chain_errors)
         
         Returns:
-            dict with 'valid' boolean and 'errors' list describing any issues found
+            dict with 'valid' boolean, 'errors' list describing any issues found
+            and 'checked_blocks' (blocks validated by this call)
         """
-        errors = []
-        
         # Check if chain exists and has at least genesis block
         if not self.chain or len(self.chain) == 0:
-            errors.append("Blockchain is empty")
-            return {'valid': False, 'errors': errors}
-        
-        # Validate genesis block
-        genesis = self.chain[0]
-        if genesis.index != 0:
-            errors.append(f"Genesis block has invalid index: {genesis.index}")
-        if genesis.previous_hash != "0":
-            errors.append(f"Genesis block has invalid previous_hash: {genesis.previous_hash}")
-        
-        # Validate genesis block hash
-        if hasattr(genesis, 'hash'):
-            computed_genesis_hash = genesis.compute_hash()
-            if genesis.hash != computed_genesis_hash:
-                errors.append(f"Genesis block hash mismatch. Expected: {computed_genesis_hash}, Got: {genesis.hash}")
+            return {'valid': False, 'errors': ["Blockchain is empty"]}
+        
+        start = 0 if full else self._checkpoint_start()
+        errors = self.chain_errors(self.chain, start, workers)
+        self._update_checkpoint(start, errors)
+        
+        return {
+            'valid': len(errors) == 0,
+            'errors': errors,
+            'total_blocks': len(self.chain),
+            'checked_blocks': len(self.chain) - start
+        }
+
+    def validate_chain_stream(self, full=False, max_errors=None, batch_size=None):
+        """Validate like validate_chain, yielding progress as it goes.
+
+        Blocks are checked in batches of batch_size (VALIDATION_BATCH_SIZE by
+        default); a progress record follows each batch and a result record
+        ends the stream. With max_errors set, validation stops once that many
+        errors were found: stopped_early tells that blocks were left
+        unchecked, errors_truncated that errors beyond max_errors were
+        dropped. The checkpoint only moves after a complete pass.
+
+        Yields:
+            {"type": "progress", "checked", "total", "rate" (blocks/s),
+             "errors" (count so far), "new_errors"} records, then
+            {"type": "result", "valid", "errors", "checked", "total",
+             "stopped_early", "errors_truncated"}
+        """
+        chain = self.chain
+        if not chain:
+            yield {"type": "result", "valid": False, "errors": ["Blockchain is empty"],
+                   "checked": 0, "total": 0, "stopped_early": False, "errors_truncated": False}
+            return
+
+        batch_size = batch_size or self.VALIDATION_BATCH_SIZE
+        start = 0 if full else self._checkpoint_start()
+        length = len(chain)  # Blocks mined meanwhile are left for the next pass
+        total = length - start
+        errors = []
+        stopped_early = False
+        errors_truncated = False
+        start_time = time.time()
+        position = start
+        while position < length:
+            end = min(position + batch_size, length)
+            new_errors = self._check_blocks(chain, position, end)
+            if max_errors is not None and len(errors) + len(new_errors) >= max_errors:
+                errors_truncated = len(errors) + len(new_errors) > max_errors
+                new_errors = new_errors[:max_errors - len(errors)]
+                stopped_early = end < length
+            errors.extend(new_errors)
+            position = end
+            elapsed = time.time() - start_time
+            yield {
+                "type": "progress",
+                "checked": position - start,
+                "total": total,
+                "rate": round((position - start) / elapsed, 2) if elapsed else 0,
+                "errors": len(errors),
+                "new_errors": new_errors
+            }
+            if max_errors is not None and len(errors) >= max_errors:
+                break
+
+        if not stopped_early:
+            self._update_checkpoint(start, errors, chain, length)
+        yield {
+            "type": "result",
+            "valid": not errors,
+            "errors": errors,
+            "checked": position - start,
+            "total": total,
+            "stopped_early": stopped_early,
+            "errors_truncated": errors_truncated
+        }
+
+    def _update_checkpoint(self, start, errors, chain=None, length=None):
+        """Move the checkpoint to chain[length - 1] after a clean pass from start"""
+        chain = self.chain if chain is None else chain
+        length = len(chain) if length is None else length
+        if chain is not self.chain:
+            return  # Replaced while validating
+        if not errors:
+            self.checkpoint = {"height": length - 1, "hash": chain[length - 1].hash}
+        elif start == 0:
+            self.checkpoint = None
+
+    def chain_errors(self, chain, start=0, workers=1):
+        """Check hashes, linkage, bits and proof of work of chain[start:].
+
+        With workers > 1 and at least PARALLEL_VALIDATION_MIN_BLOCKS blocks to
+        check, the blocks are split into one contiguous shard per worker
+        process. Each shard also receives the RETARGET_WINDOW + 1 blocks before it,
+        which its linkage and retarget checks read. Errors are returned in
+        block order either way.
+
+        Args:
+            chain: List of blocks (self.chain or a chain not yet accepted)
+            start: Index of the first block to check; blocks before it are trusted
+            workers: Number of validation processes
+
+        Returns:
+            list of error messages, empty if the blocks are valid
+        """
+        count = len(chain) - start
+        workers = min(workers, count)
+        if workers <= 1 or count < self.PARALLEL_VALIDATION_MIN_BLOCKS:
+            return self._check_blocks(chain, start, len(chain))
+
+        settings = {name: getattr(self, name) for name in _VALIDATION_SETTINGS}
+        backend = hash_backends.get_backend().name
+        bounds = [start + count * n // workers for n in range(workers + 1)]
+        shards = []
+        for first, last in zip(bounds, bounds[1:]):
+            context = max(0, first - self.RETARGET_WINDOW - 1)
+            shards.append((settings, backend, chain[context:last], first - context))
+
+        ctx = multiprocessing.get_context()
+        with ctx.Pool(workers) as pool:
+            results = pool.starmap(_validate_shard, shards)
+        return [error for shard_errors in results for error in shard_errors]
+
+    def _check_blocks(self, chain, start, end):
+        """Errors of chain[start:end], reading earlier blocks for linkage and bits"""
+        errors = []
+        
+        # Recompute the hash of every checked block in one batch
+        computed_hashes = Block.compute_hashes(chain[start:end])
+        
+        if start == 0:
+            # Validate genesis block
+            genesis = chain[0]
+            if genesis.index != 0:
+                errors.append(f"Genesis block has invalid index: {genesis.index}")
+            if genesis.previous_hash != "0":
+                errors.append(f"Genesis block has invalid previous_hash: {genesis.previous_hash}")
+            
+            # Validate genesis block hash
+            if hasattr(genesis, 'hash'):
+                computed_genesis_hash = computed_hashes[0]
+                if genesis.hash != computed_genesis_hash:
+                    errors.append(f"Genesis block hash mismatch. Expected: {computed_genesis_hash}, Got: {genesis.hash}")
         
         # Validate each subsequent block
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i - 1]
+        for i in range(max(start, 1), end):
+            current_block = chain[i]
+            previous_block = chain[i - 1]
             
             # Check if block has a hash attribute
             if not hasattr(current_block, 'hash'):
@@ -178,71 +633,106 @@ class Blockchain:
                     f"Block #{current_block.index} has invalid previous_hash. "
                     f"Expected: {previous_block.hash}, Got: {current_block.previous_hash}"
                 )
+
+            if current_block.version < previous_block.version:
+                errors.append(
+                    f"Block #{current_block.index} has version {current_block.version} "
+                    f"after a version {previous_block.version} block"
+                )
             
             # Verify the block's hash matches its computed hash
-            computed_hash = current_block.compute_hash()
+            computed_hash = computed_hashes[i - start]
             if current_block.hash != computed_hash:
                 errors.append(
                     f"Block #{current_block.index} hash mismatch. "
                     f"Expected: {computed_hash}, Got: {current_block.hash}"
                 )
             
-            # Verify proof of work (hash starts with required zeros)
-            if hasattr(current_block, 'difficulty') and current_block.difficulty:
-                difficulty = current_block.difficulty
-                if not current_block.hash.startswith('0' * difficulty):
+            if not self.within_block_limits(current_block):
+                errors.append(f"Block #{current_block.index} exceeds the block size limits")
+            
+            # Duplicated transactions leave the Merkle root unchanged
+            if current_block.version >= HEADER_VERSION and current_block.has_duplicate_transactions():
+                errors.append(f"Block #{current_block.index} contains duplicate transactions")
+            
+            timestamp_error = self.timestamp_error(current_block, previous_block)
+            if timestamp_error:
+                errors.append(timestamp_error)
+            
+            # Verify the target was retargeted correctly
+            if current_block.version >= TARGET_VERSION:
+                window = chain[max(0, i - self.RETARGET_WINDOW - 1):i]
+                expected_bits = self.next_bits(window)
+                if current_block.bits != expected_bits:
                     errors.append(
-                        f"Block #{current_block.index} does not meet difficulty requirement. "
-                        f"Difficulty: {difficulty}, Hash: {current_block.hash}"
+                        f"Block #{current_block.index} has invalid bits. "
+                        f"Expected: {expected_bits:#010x}, Got: {current_block.bits}"
                     )
+                    continue
+            
+            # Verify proof of work (hash is at most the target)
+            try:
+                meets_target = hash_meets_target(current_block.hash, current_block.target)
+            except (ValueError, TypeError):
+                meets_target = False
+            if not meets_target:
+                errors.append(
+                    f"Block #{current_block.index} does not meet difficulty requirement. "
+                    f"Difficulty: {current_block.difficulty}, Hash: {current_block.hash}"
+                )
         
-        return {
-            'valid': len(errors) == 0,
-            'errors': errors,
-            'total_blocks': len(self.chain)
-        }
+        return errors
 
-    def mine(self, miner_address=None, mining_reward=50):
+    def mine(self, miner_address=None, mining_reward=50, workers=1, restart_on_new_transactions=False, should_stop=None):
         """Mine pending transactions into a new block.
         
         Args:
             miner_address: Address to receive mining reward (optional)
             mining_reward: Amount of coins to reward the miner (default 50)
+            workers: Number of mining processes (default 1, in-process)
+            restart_on_new_transactions: Also stop when transactions arrive
+                while mining, so the caller can restart and include them
+            should_stop: Optional extra stop callback (returns a reason or None)
         
         Returns:
-            dict with block index and mining time, or False if mining failed
+            dict with block index, mining time and hashrates, or False if mining failed
+        
+        Raises:
+            MiningCancelled: the chain tip changed while mining (e.g. a peer
+                block was accepted), new transactions arrived and
+                restart_on_new_transactions is set, or should_stop fired
         """
-        if not self.unconfirmed_transactions and not miner_address:
+        if not len(self.mempool) and not miner_address:
             return False
         
-        # Create coinbase transaction for mining reward
-        if miner_address:
-            coinbase_transaction = {
-                "sender_address": "COINBASE",
-                "sender_pubkey": None,
-                "receiver_address": miner_address,
-                "amount": mining_reward,
-                "signature": None
-            }
-            # Prepend coinbase transaction to the list
-            transactions_to_mine = [coinbase_transaction] + self.unconfirmed_transactions
-        else:
-            transactions_to_mine = self.unconfirmed_transactions
+        # The template already holds the pending transactions and their ids;
+        # the coinbase transaction for the mining reward is prepended
+        template = self.block_template()
+        last_block = template.previous_block
+        pending_count = len(template.transactions)
+        coinbase = coinbase_transaction(miner_address, mining_reward) if miner_address else None
+        new_block = template.build(coinbase)
         
-        last_block = self.last_block
-        current_difficulty = self.get_difficulty()
+        def stop_reason():
+            if self.last_block is not last_block:
+                return "chain tip changed"
+            # Transactions that arrive once the block is full wait for the next one
+            if restart_on_new_transactions and len(template.transactions) != pending_count:
+                return "new transactions"
+            return should_stop() if should_stop else None
 
-        new_block = Block(index=last_block.index+1,
-                                transactions=transactions_to_mine,
-                                previous_hash=last_block.hash,
-                                difficulty=current_difficulty)
-        
-        proof = self.proof_of_work(new_block)
-        self.add_block(new_block, proof)
-        self.unconfirmed_transactions = []
+        proof = self.proof_of_work(new_block, workers=workers, should_stop=stop_reason)
+        # add_block removes the mined transactions and keeps those that
+        # arrived while mining or did not fit in the block
+        if not self.add_block(new_block, proof):
+            if self.last_block is not last_block:
+                raise MiningCancelled("chain tip changed")
+            raise RuntimeError(f"Mined block #{new_block.index} was rejected")
     
         return {
             'index': new_block.index,
             'mining_time': new_block.mining_time,
-            'difficulty': new_block.difficulty
+            'difficulty': new_block.difficulty,
+            'hashrate': self.last_mining_stats['hashrate'],
+            'workers': self.last_mining_stats['workers']
         }
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""Proof-of-work targets.
+
+A block hash is valid when, read as a 256-bit integer, it is <= the block
+target. Targets are stored in headers as 32-bit compact "bits": one exponent
+byte (target size in bytes) and a 3-byte mantissa, as in Bitcoin.
+"""
+import math
+
+MAX_TARGET = (1 << 256) - 1
+
+
+def target_from_zeros(zeros: int) -> int:
+    """Target equivalent to requiring `zeros` leading hex zeros in the hash"""
+    return (1 << (256 - 4 * zeros)) - 1
+
+def target_to_bits(target: int) -> int:
+    """Compact encoding of a target (rounded down to 3 significant bytes)"""
+    size = (target.bit_length() + 7) // 8
+    if size <= 3:
+        mantissa = target << 8 * (3 - size)
+    else:
+        mantissa = target >> 8 * (size - 3)
+    # The mantissa's top bit is a sign bit in the compact format
+    if mantissa & 0x800000:
+        mantissa >>= 8
+        size += 1
+    return (size << 24) | mantissa
+
+def bits_to_target(bits: int) -> int:
+    size = bits >> 24
+    mantissa = bits & 0x7fffff
+    if size <= 3:
+        return mantissa >> 8 * (3 - size)
+    return mantissa << 8 * (size - 3)
+
+def target_to_difficulty(target: int) -> float:
+    """Human readable difficulty: the equivalent number of leading hex zeros"""
+    return round(math.log(MAX_TARGET / max(target, 1), 16), 2)
+
+def hash_meets_target(block_hash: str, target: int) -> bool:
+    """Raises ValueError if block_hash is not hex"""
+    return int(block_hash, 16) <= target
+
+def retarget(targets, block_times, block_interval, max_factor=4, limit=MAX_TARGET) -> int:
+    """Target aimed at one block every block_interval seconds.
+
+    The average target of the window is scaled by how long its blocks took
+    compared to block_interval, using integer arithmetic (times in
+    hundredths of a second). The change is clamped to a factor of
+    max_factor either way and never exceeds limit.
+
+    Args:
+        targets: Targets of the blocks in the window
+        block_times: Seconds each of the same blocks took (timestamp gaps)
+        block_interval: Wanted seconds per block
+        max_factor: Largest adjustment per retarget
+        limit: Easiest allowed target
+    """
+    average = sum(targets) // len(targets)
+    actual = sum(round(t * 100) for t in block_times)
+    expected = round(block_interval * 100) * len(block_times)
+    target = average * actual // expected
+    target = max(average // max_factor, min(target, average * max_factor))
+    return max(1, min(target, limit))
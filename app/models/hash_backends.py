@@ -0,0 +1,200 @@
+"""
+Selectable hash backends for SHA-256 and RIPEMD-160.
+
+Every hash used by the node (block hashes, transaction hashes, addresses)
+goes through the module-level functions below, which dispatch to the active
+backend chosen at startup:
+
+- "reference": the pure-Python implementations in hash_functions (default)
+- "unrolled": code-generated straight-line versions from hash_unrolled
+- "hashlib": the stdlib/OpenSSL implementations
+
+The reference backend stays the oracle: in cross-check mode a configurable
+fraction of the digests produced by the active backend is recomputed with
+the reference code and any mismatch is counted and reported.
+"""
+import hashlib
+import random
+import threading
+from . import hash_functions, hash_unrolled
+
+# Number of mismatches kept for the stats report
+_MAX_REPORTED_MISMATCHES = 20
+
+
+class HashBackend:
+    """A named set of hash primitives.
+
+    Args:
+        name: Registry key
+        sha256: Function bytes -> 32-byte digest
+        ripemd160: Function bytes -> 20-byte digest
+        sha256_midstate: Function prefix -> opaque state for sha256_batch
+        sha256_batch: Function (messages, midstate=None) -> list of digests
+        batch_accelerated: True when hashing many messages per call is
+            cheaper than hashing them one by one
+    """
+    def __init__(self, name, sha256, ripemd160, sha256_midstate, sha256_batch, batch_accelerated=False):
+        self.name = name
+        self.sha256 = sha256
+        self.ripemd160 = ripemd160
+        self.sha256_midstate = sha256_midstate
+        self.sha256_batch = sha256_batch
+        self.batch_accelerated = batch_accelerated
+
+
+def _hashlib_ripemd160():
+    """RIPEMD-160 from OpenSSL, or the reference one when OpenSSL lacks it"""
+    try:
+        hashlib.new('ripemd160')
+    except ValueError:
+        return hash_functions.ripemd160
+    return lambda data: hashlib.new('ripemd160', data).digest()
+
+def _hashlib_sha256_midstate(prefix):
+    return hashlib.sha256(prefix)
+
+def _hashlib_sha256_batch(messages, midstate=None):
+    if midstate is None:
+        return [hashlib.sha256(message).digest() for message in messages]
+    digests = []
+    for message in messages:
+        h = midstate.copy()
+        h.update(message)
+        digests.append(h.digest())
+    return digests
+
+
+REFERENCE = HashBackend(
+    "reference",
+    sha256=hash_functions.sha256,
+    ripemd160=hash_functions.ripemd160,
+    sha256_midstate=hash_functions.sha256_midstate,
+    sha256_batch=hash_functions.sha256_batch,
+    batch_accelerated=hash_functions.BATCH_ACCELERATED
+)
+
+UNROLLED = HashBackend(
+    "unrolled",
+    sha256=hash_unrolled.sha256,
+    ripemd160=hash_unrolled.ripemd160,
+    sha256_midstate=hash_unrolled.sha256_midstate,
+    sha256_batch=hash_unrolled.sha256_batch,
+    batch_accelerated=hash_functions.BATCH_ACCELERATED
+)
+
+HASHLIB = HashBackend(
+    "hashlib",
+    sha256=lambda data: hashlib.sha256(data).digest(),
+    ripemd160=_hashlib_ripemd160(),
+    sha256_midstate=_hashlib_sha256_midstate,
+    sha256_batch=_hashlib_sha256_batch,
+    batch_accelerated=True
+)
+
+_backends = {}
+_active = REFERENCE
+_cross_check_rate = 0.0
+_stats_lock = threading.Lock()
+_stats = {"checked": 0, "mismatches": 0}
+_mismatches = []
+
+
+def register_backend(backend: HashBackend):
+    """Make a backend selectable by name"""
+    _backends[backend.name] = backend
+
+def available_backends() -> list:
+    return sorted(_backends)
+
+def get_backend() -> HashBackend:
+    return _active
+
+def set_backend(name: str, cross_check_rate: float = 0.0):
+    """Select the active backend and the cross-check sampling rate.
+
+    Args:
+        name: Registered backend name
+        cross_check_rate: Fraction (0.0 - 1.0) of digests to recompute with
+            the reference backend. Ignored when the reference is active.
+    """
+    global _active, _cross_check_rate
+    if name not in _backends:
+        raise ValueError(f"Unknown hash backend: {name}. Available: {', '.join(available_backends())}")
+    if not 0.0 <= cross_check_rate <= 1.0:
+        raise ValueError("cross_check_rate must be between 0 and 1")
+    _active = _backends[name]
+    _cross_check_rate = cross_check_rate
+    reset_stats()
+
+def reset_stats():
+    with _stats_lock:
+        _stats["checked"] = 0
+        _stats["mismatches"] = 0
+        _mismatches.clear()
+
+def get_stats() -> dict:
+    with _stats_lock:
+        return {
+            "backend": _active.name,
+            "available_backends": available_backends(),
+            "cross_check_rate": _cross_check_rate,
+            "checked": _stats["checked"],
+            "mismatches": _stats["mismatches"],
+            "recent_mismatches": list(_mismatches)
+        }
+
+
+def _should_check() -> bool:
+    return _active is not REFERENCE and _cross_check_rate > 0 and random.random() < _cross_check_rate
+
+def _check(algorithm, data, digest, reference):
+    expected = reference(data)
+    with _stats_lock:
+        _stats["checked"] += 1
+        if digest == expected:
+            return
+        _stats["mismatches"] += 1
+        _mismatches.append({
+            "backend": _active.name,
+            "algorithm": algorithm,
+            "input_length": len(data),
+            "digest": digest.hex(),
+            "expected": expected.hex()
+        })
+        del _mismatches[:-_MAX_REPORTED_MISMATCHES]
+    print(f"Hash cross-check mismatch: {_active.name} {algorithm} returned {digest.hex()}, reference {expected.hex()}")
+
+
+def sha256(data: bytes) -> bytes:
+    digest = _active.sha256(data)
+    if _should_check():
+        _check("sha256", bytes(data), digest, REFERENCE.sha256)
+    return digest
+
+def ripemd160(data: bytes) -> bytes:
+    digest = _active.ripemd160(data)
+    if _should_check():
+        _check("ripemd160", bytes(data), digest, REFERENCE.ripemd160)
+    return digest
+
+def sha256_midstate(prefix: bytes):
+    """Midstate of the active backend, to be passed to sha256_batch"""
+    return (bytes(prefix), _active, _active.sha256_midstate(prefix))
+
+def sha256_batch(messages, midstate=None) -> list:
+    """Hash many messages, optionally as tails of a sha256_midstate prefix"""
+    if midstate is None:
+        prefix, backend, state = b'', _active, None
+    else:
+        prefix, backend, state = midstate
+    digests = backend.sha256_batch(messages, state)
+    for message, digest in zip(messages, digests):
+        if _should_check():
+            _check("sha256", prefix + bytes(message), digest, REFERENCE.sha256)
+    return digests
+
+
+register_backend(REFERENCE)
+register_backend(UNROLLED)
+register_backend(HASHLIB)
@@ -5,6 +5,11 @@ Following official specifications:
 - RIPEMD-160: ISO/IEC 10118-3
 """
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, sha256_batch falls back to sha256
+    np = None
+
 def _rotr(n, b):
     """Rotate right: rotate n right by b bits (32-bit)"""
     return ((n >> b) | (n << (32 - b))) & 0xffffffff
@@ -37,6 +42,74 @@ def _sha256_gamma1(x):
     """SHA-256 σ1 function"""
     return _rotr(x, 17) ^ _rotr(x, 19) ^ _shr(x, 10)
 
+# Initial hash values (first 32 bits of fractional parts of square roots of first 8 primes)
+_SHA256_H0 = (
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
+    0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19
+)
+
+# Round constants (first 32 bits of fractional parts of cube roots of first 64 primes)
+_SHA256_K = [
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2
+]
+
+def _sha256_compress(H, chunk):
+    """Process one 64-byte chunk, updating the 8-word state list H in place"""
+    # Create message schedule (64 x 32-bit words)
+    W = []
+    for i in range(16):
+        W.append(int.from_bytes(chunk[i*4:(i+1)*4], 'big'))
+    
+    for i in range(16, 64):
+        s0 = _sha256_gamma0(W[i-15])
+        s1 = _sha256_gamma1(W[i-2])
+        W.append((W[i-16] + s0 + W[i-7] + s1) & 0xffffffff)
+    
+    # Initialize working variables
+    a, b, c, d, e, f, g, h = H
+    
+    # Main loop (64 rounds)
+    for i in range(64):
+        S1 = _sha256_sigma1(e)
+        ch = _sha256_ch(e, f, g)
+        temp1 = (h + S1 + ch + _SHA256_K[i] + W[i]) & 0xffffffff
+        S0 = _sha256_sigma0(a)
+        maj = _sha256_maj(a, b, c)
+        temp2 = (S0 + maj) & 0xffffffff
+        
+        h = g
+        g = f
+        f = e
+        e = (d + temp1) & 0xffffffff
+        d = c
+        c = b
+        b = a
+        a = (temp1 + temp2) & 0xffffffff
+    
+    # Add compressed chunk to current hash value
+    H[0] = (H[0] + a) & 0xffffffff
+    H[1] = (H[1] + b) & 0xffffffff
+    H[2] = (H[2] + c) & 0xffffffff
+    H[3] = (H[3] + d) & 0xffffffff
+    H[4] = (H[4] + e) & 0xffffffff
+    H[5] = (H[5] + f) & 0xffffffff
+    H[6] = (H[6] + g) & 0xffffffff
+    H[7] = (H[7] + h) & 0xffffffff
+
+def _sha256_padding(msg_len):
+    """FIPS 180-4 padding for a message of msg_len bytes"""
+    # Append bit '1' followed by zeros until length ≡ 448 (mod 512),
+    # then the original message length in bits as 64-bit big-endian
+    zeros = (55 - msg_len) % 64
+    return b'\x80' + b'\x00' * zeros + (msg_len * 8).to_bytes(8, 'big')
+
 def sha256(data: bytes) -> bytes:
     """
     Custom SHA-256 implementation following FIPS 180-4.
@@ -47,84 +120,143 @@ def sha256(data: bytes) -> bytes:
     Returns:
         32-byte hash digest
     """
-    # Initial hash values (first 32 bits of fractional parts of square roots of first 8 primes)
-    H = [
-        0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
-        0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19
-    ]
+    return SHA256(data).digest()
+
+def sha256_midstate(prefix: bytes):
+    """
+    Compress every complete 64-byte chunk of a fixed message prefix once.
     
-    # Round constants (first 32 bits of fractional parts of cube roots of first 64 primes)
-    K = [
-        0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
-        0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
-        0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
-        0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
-        0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
-        0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
-        0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
-        0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2
-    ]
+    The returned midstate can be completed with many different tails via
+    sha256_from_midstate() or sha256_batch(), which only re-compress the
+    chunks that contain the tail (e.g. the nonce of a block being mined).
     
-    # Pre-processing: padding the message
-    msg = bytearray(data)
-    msg_len = len(data)
-    msg.append(0x80)  # Append bit '1' followed by zeros
+    Args:
+        prefix: Bytes shared by every message that will be hashed
+        
+    Returns:
+        SHA256 hasher holding the prefix state
+    """
+    return SHA256(prefix)
+
+def sha256_from_midstate(midstate, tail: bytes) -> bytes:
+    """
+    Finish a SHA-256 started with sha256_midstate().
     
-    # Pad until message length ≡ 448 (mod 512)
-    while (len(msg) % 64) != 56:
-        msg.append(0x00)
+    Args:
+        midstate: Value returned by sha256_midstate(prefix)
+        tail: Remaining message bytes after the prefix
+        
+    Returns:
+        32-byte digest, identical to sha256(prefix + tail)
+    """
+    h = midstate.copy()
+    h.update(tail)
+    return h.digest()
+
+
+# True when sha256_batch can vectorize (numpy is installed)
+BATCH_ACCELERATED = np is not None
+
+# Smallest group worth vectorizing; below this the per-call numpy overhead
+# is higher than hashing the messages one by one
+_SHA256_BATCH_MIN = 8
+
+def _np_rotr(x, b):
+    """Rotate right every uint32 in the array x by b bits"""
+    return (x >> np.uint32(b)) | (x << np.uint32(32 - b))
+
+def _sha256_compress_batch(H, words):
+    """
+    Process one chunk for N messages at once.
     
-    # Append original message length in bits as 64-bit big-endian
-    msg.extend((msg_len * 8).to_bytes(8, 'big'))
+    Args:
+        H: (8, N) uint32 array of states, updated in place
+        words: (16, N) uint32 array with the chunk of every message
+    """
+    W = list(words)
+    for i in range(16, 64):
+        x = W[i-15]
+        s0 = _np_rotr(x, 7) ^ _np_rotr(x, 18) ^ (x >> np.uint32(3))
+        x = W[i-2]
+        s1 = _np_rotr(x, 17) ^ _np_rotr(x, 19) ^ (x >> np.uint32(10))
+        W.append(W[i-16] + s0 + W[i-7] + s1)
     
-    # Process message in 512-bit (64-byte) chunks
-    for chunk_start in range(0, len(msg), 64):
-        chunk = msg[chunk_start:chunk_start + 64]
-        
-        # Create message schedule (64 x 32-bit words)
-        W = []
-        for i in range(16):
-            W.append(int.from_bytes(chunk[i*4:(i+1)*4], 'big'))
+    a, b, c, d, e, f, g, h = H
+    for i in range(64):
+        S1 = _np_rotr(e, 6) ^ _np_rotr(e, 11) ^ _np_rotr(e, 25)
+        ch = (e & f) ^ (~e & g)
+        temp1 = h + S1 + ch + np.uint32(_SHA256_K[i]) + W[i]
+        S0 = _np_rotr(a, 2) ^ _np_rotr(a, 13) ^ _np_rotr(a, 22)
+        maj = (a & b) ^ (a & c) ^ (b & c)
+        temp2 = S0 + maj
         
-        for i in range(16, 64):
-            s0 = _sha256_gamma0(W[i-15])
-            s1 = _sha256_gamma1(W[i-2])
-            W.append((W[i-16] + s0 + W[i-7] + s1) & 0xffffffff)
+        h = g
+        g = f
+        f = e
+        e = d + temp1
+        d = c
+        c = b
+        b = a
+        a = temp1 + temp2
+    
+    H += np.stack([a, b, c, d, e, f, g, h])
+
+def sha256_batch(messages, midstate=None):
+    """
+    Hash many messages, vectorizing the 64 rounds over NumPy uint32 arrays.
+    
+    Messages that pad to the same number of 64-byte chunks (e.g. block
+    candidates for a range of nonces) are compressed together in one pass.
+    Without numpy, or for very small groups, each message is compressed with
+    the midstate's own scalar compression function instead, so results are
+    always identical to the scalar path.
+    
+    Args:
+        messages: Sequence of bytes objects
+        midstate: Optional value from sha256_midstate(prefix); every message
+            is then treated as the tail following that shared prefix
         
-        # Initialize working variables
-        a, b, c, d, e, f, g, h = H
+    Returns:
+        List of 32-byte digests, in the same order as messages
+    """
+    if midstate is None:
+        midstate = SHA256()
+    state = midstate._H
+    leftover = bytes(midstate._buffer)
+    compressed = midstate._length - len(leftover)
+    compress = midstate._compress
+    
+    # Pad every message and group them by number of chunks
+    groups = {}
+    for position, message in enumerate(messages):
+        msg = leftover + bytes(message)
+        msg += _sha256_padding(compressed + len(msg))
+        groups.setdefault(len(msg), []).append((position, msg))
+    
+    digests = [None] * len(messages)
+    for padded_len, group in groups.items():
+        if np is None or len(group) < _SHA256_BATCH_MIN:
+            for position, msg in group:
+                H = list(state)
+                for chunk_start in range(0, padded_len, 64):
+                    compress(H, msg[chunk_start:chunk_start + 64])
+                digests[position] = b''.join(h.to_bytes(4, 'big') for h in H)
+            continue
         
-        # Main loop (64 rounds)
-        for i in range(64):
-            S1 = _sha256_sigma1(e)
-            ch = _sha256_ch(e, f, g)
-            temp1 = (h + S1 + ch + K[i] + W[i]) & 0xffffffff
-            S0 = _sha256_sigma0(a)
-            maj = _sha256_maj(a, b, c)
-            temp2 = (S0 + maj) & 0xffffffff
-            
-            h = g
-            g = f
-            f = e
-            e = (d + temp1) & 0xffffffff
-            d = c
-            c = b
-            b = a
-            a = (temp1 + temp2) & 0xffffffff
+        # (N, words) big-endian words, transposed to (words, N) for the rounds
+        raw = b''.join(msg for _, msg in group)
+        words = np.frombuffer(raw, dtype='>u4').astype(np.uint32)
+        words = words.reshape(len(group), padded_len // 4).T
+        H = np.repeat(np.array(state, dtype=np.uint32)[:, None], len(group), axis=1)
+        with np.errstate(over='ignore'):
+            for word_start in range(0, padded_len // 4, 16):
+                _sha256_compress_batch(H, words[word_start:word_start + 16])
         
-        # Add compressed chunk to current hash value
-        H[0] = (H[0] + a) & 0xffffffff
-        H[1] = (H[1] + b) & 0xffffffff
-        H[2] = (H[2] + c) & 0xffffffff
-        H[3] = (H[3] + d) & 0xffffffff
-        H[4] = (H[4] + e) & 0xffffffff
-        H[5] = (H[5] + f) & 0xffffffff
-        H[6] = (H[6] + g) & 0xffffffff
-        H[7] = (H[7] + h) & 0xffffffff
+        out = H.T.astype('>u4').tobytes()
+        for i, (position, _) in enumerate(group):
+            digests[position] = out[i * 32:(i + 1) * 32]
     
-    # Produce final hash value (big-endian)
-    digest = b''.join(h.to_bytes(4, 'big') for h in H)
-    return digest
+    return digests
 
 
 def _rotl(n, b):
@@ -170,6 +302,91 @@ def _ripemd160_Kp(j):
     else:  # 64 <= j < 80
         return 0x00000000
 
+# Initial hash values
+_RIPEMD160_H0 = (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0)
+
+# Message permutation for left line
+_RIPEMD160_R = [
+    0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+    7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
+    3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12,
+    1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2,
+    4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13
+]
+
+# Message permutation for right line
+_RIPEMD160_RP = [
+    5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12,
+    6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
+    15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13,
+    8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14,
+    12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11
+]
+
+# Rotation amounts for left line
+_RIPEMD160_S = [
+    11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8,
+    7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
+    11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5,
+    11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12,
+    9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6
+]
+
+# Rotation amounts for right line
+_RIPEMD160_SP = [
+    8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6,
+    9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
+    9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5,
+    15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8,
+    8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11
+]
+
+def _ripemd160_compress(H, chunk):
+    """Process one 64-byte chunk, updating the 5-word state list H in place"""
+    r, rp, s, sp = _RIPEMD160_R, _RIPEMD160_RP, _RIPEMD160_S, _RIPEMD160_SP
+    
+    # Break chunk into 16 x 32-bit little-endian words
+    X = []
+    for i in range(16):
+        X.append(int.from_bytes(chunk[i*4:(i+1)*4], 'little'))
+    
+    # Initialize working variables
+    AL, BL, CL, DL, EL = H
+    AR, BR, CR, DR, ER = H
+    
+    # 80 rounds
+    for j in range(80):
+        # Left line
+        T = (AL + _ripemd160_f(j, BL, CL, DL) + X[r[j]] + _ripemd160_K(j)) & 0xffffffff
+        T = (_rotl(T, s[j]) + EL) & 0xffffffff
+        AL = EL
+        EL = DL
+        DL = _rotl(CL, 10)
+        CL = BL
+        BL = T
+        
+        # Right line
+        T = (AR + _ripemd160_f(79 - j, BR, CR, DR) + X[rp[j]] + _ripemd160_Kp(j)) & 0xffffffff
+        T = (_rotl(T, sp[j]) + ER) & 0xffffffff
+        AR = ER
+        ER = DR
+        DR = _rotl(CR, 10)
+        CR = BR
+        BR = T
+    
+    # Update hash values
+    T = (H[1] + CL + DR) & 0xffffffff
+    H[1] = (H[2] + DL + ER) & 0xffffffff
+    H[2] = (H[3] + EL + AR) & 0xffffffff
+    H[3] = (H[4] + AL + BR) & 0xffffffff
+    H[4] = (H[0] + BL + CR) & 0xffffffff
+    H[0] = T
+
+def _ripemd160_padding(msg_len):
+    """Same padding as SHA-256, but with the bit length little-endian"""
+    zeros = (55 - msg_len) % 64
+    return b'\x80' + b'\x00' * zeros + (msg_len * 8).to_bytes(8, 'little')
+
 def ripemd160(data: bytes) -> bytes:
     """
     Custom RIPEMD-160 implementation following ISO/IEC 10118-3.
@@ -180,97 +397,81 @@ def ripemd160(data: bytes) -> bytes:
     Returns:
         20-byte hash digest
     """
-    # Initial hash values
-    H = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0]
-    
-    # Message permutation for left line
-    r = [
-        0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
-        7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
-        3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12,
-        1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2,
-        4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13
-    ]
-    
-    # Message permutation for right line
-    rp = [
-        5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12,
-        6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
-        15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13,
-        8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14,
-        12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11
-    ]
-    
-    # Rotation amounts for left line
-    s = [
-        11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8,
-        7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
-        11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5,
-        11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12,
-        9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6
-    ]
-    
-    # Rotation amounts for right line
-    sp = [
-        8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6,
-        9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
-        9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5,
-        15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8,
-        8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11
-    ]
-    
-    # Pre-processing: padding
-    msg = bytearray(data)
-    msg_len = len(data)
-    msg.append(0x80)
+    return RIPEMD160(data).digest()
+
+
+class _BlockHash:
+    """
+    Incremental Merkle-Damgard hasher with a hashlib-style interface.
     
-    while (len(msg) % 64) != 56:
-        msg.append(0x00)
+    update() consumes any bytes-like object through a memoryview: complete
+    64-byte chunks are compressed straight from the caller's buffer and only
+    the last partial chunk (< 64 bytes) is kept. copy() clones the state, so a
+    shared prefix can be hashed once and finished with different tails.
+    Subclasses provide the initial state, compression, padding and byte order.
+    """
+    block_size = 64
     
-    # Append length in bits as 64-bit little-endian
-    msg.extend((msg_len * 8).to_bytes(8, 'little'))
+    def __init__(self, data=b''):
+        self._H = list(self._H0)
+        self._buffer = bytearray()
+        self._length = 0
+        if data:
+            self.update(data)
     
-    # Process message in 512-bit chunks
-    for chunk_start in range(0, len(msg), 64):
-        chunk = msg[chunk_start:chunk_start + 64]
+    def update(self, data):
+        view = memoryview(data).cast('B')
+        self._length += len(view)
         
-        # Break chunk into 16 x 32-bit little-endian words
-        X = []
-        for i in range(16):
-            X.append(int.from_bytes(chunk[i*4:(i+1)*4], 'little'))
+        # Complete a pending partial chunk first
+        if self._buffer:
+            take = 64 - len(self._buffer)
+            self._buffer += view[:take]
+            view = view[take:]
+            if len(self._buffer) < 64:
+                return
+            self._compress(self._H, self._buffer)
+            self._buffer = bytearray()
         
-        # Initialize working variables
-        AL, BL, CL, DL, EL = H
-        AR, BR, CR, DR, ER = H
-        
-        # 80 rounds
-        for j in range(80):
-            # Left line
-            T = (AL + _ripemd160_f(j, BL, CL, DL) + X[r[j]] + _ripemd160_K(j)) & 0xffffffff
-            T = (_rotl(T, s[j]) + EL) & 0xffffffff
-            AL = EL
-            EL = DL
-            DL = _rotl(CL, 10)
-            CL = BL
-            BL = T
-            
-            # Right line
-            T = (AR + _ripemd160_f(79 - j, BR, CR, DR) + X[rp[j]] + _ripemd160_Kp(j)) & 0xffffffff
-            T = (_rotl(T, sp[j]) + ER) & 0xffffffff
-            AR = ER
-            ER = DR
-            DR = _rotl(CR, 10)
-            CR = BR
-            BR = T
-        
-        # Update hash values
-        T = (H[1] + CL + DR) & 0xffffffff
-        H[1] = (H[2] + DL + ER) & 0xffffffff
-        H[2] = (H[3] + EL + AR) & 0xffffffff
-        H[3] = (H[4] + AL + BR) & 0xffffffff
-        H[4] = (H[0] + BL + CR) & 0xffffffff
-        H[0] = T
+        full = len(view) - (len(view) % 64)
+        for chunk_start in range(0, full, 64):
+            self._compress(self._H, view[chunk_start:chunk_start + 64])
+        self._buffer += view[full:]
+    
+    def copy(self):
+        clone = self.__class__.__new__(self.__class__)
+        clone._H = list(self._H)
+        clone._buffer = bytearray(self._buffer)
+        clone._length = self._length
+        return clone
+    
+    def digest(self) -> bytes:
+        # Pad a copy of the state so the hasher can keep receiving data
+        H = list(self._H)
+        tail = bytes(self._buffer) + self._padding(self._length)
+        for chunk_start in range(0, len(tail), 64):
+            self._compress(H, tail[chunk_start:chunk_start + 64])
+        return b''.join(h.to_bytes(4, self._byteorder) for h in H)
     
-    # Produce final hash (little-endian)
-    digest = b''.join(h.to_bytes(4, 'little') for h in H)
-    return digest
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+
+class SHA256(_BlockHash):
+    """Incremental SHA-256 (FIPS 180-4)"""
+    name = 'sha256'
+    digest_size = 32
+    _H0 = _SHA256_H0
+    _compress = staticmethod(_sha256_compress)
+    _padding = staticmethod(_sha256_padding)
+    _byteorder = 'big'
+
+
+class RIPEMD160(_BlockHash):
+    """Incremental RIPEMD-160 (ISO/IEC 10118-3)"""
+    name = 'ripemd160'
+    digest_size = 20
+    _H0 = _RIPEMD160_H0
+    _compress = staticmethod(_ripemd160_compress)
+    _padding = staticmethod(_ripemd160_padding)
+    _byteorder = 'little'
@@ -0,0 +1,165 @@
+"""
+Fully unrolled SHA-256 and RIPEMD-160 compression functions.
+
+The reference code in hash_functions follows the specifications round by
+round, calling small helpers (_rotr, _ripemd160_f, _ripemd160_K, ...) 64 or
+160 times per chunk. Here the compression functions are generated as
+straight-line source code: constants, message word indexes, rotation amounts
+and selection functions are inlined, the working variables are renamed
+instead of shuffled every round, and the result is compiled once at import.
+
+Digests are bit-identical to the reference implementation.
+"""
+from .hash_functions import (
+    _BlockHash, _SHA256_H0, _SHA256_K, _sha256_padding,
+    _RIPEMD160_H0, _RIPEMD160_R, _RIPEMD160_RP, _RIPEMD160_S, _RIPEMD160_SP,
+    _ripemd160_padding, sha256_batch as _sha256_batch
+)
+import struct
+
+_M = "0xffffffff"
+
+
+def _rotr(x, n):
+    """Source for a 32-bit right rotation, without the final mask"""
+    return f"(({x} >> {n}) | ({x} << {32 - n}))"
+
+def _rotl(x, n):
+    """Source for a masked 32-bit left rotation"""
+    return f"((({x} << {n}) | ({x} >> {32 - n})) & {_M})"
+
+
+def generate_sha256_source() -> str:
+    """Return the source of the unrolled SHA-256 compression function"""
+    lines = [
+        "def _sha256_compress(H, chunk):",
+        "    " + ", ".join(f"w{i}" for i in range(16)) + " = _unpack_be(chunk)",
+    ]
+
+    # Message schedule
+    for i in range(16, 64):
+        x, y = f"w{i - 15}", f"w{i - 2}"
+        s0 = f"((({_rotr(x, 7)} ^ {_rotr(x, 18)}) & {_M}) ^ ({x} >> 3))"
+        s1 = f"((({_rotr(y, 17)} ^ {_rotr(y, 19)}) & {_M}) ^ ({y} >> 10))"
+        lines.append(f"    w{i} = (w{i - 16} + {s0} + w{i - 7} + {s1}) & {_M}")
+
+    # Rounds: instead of shifting a..h, rotate which local plays each role
+    names = ["a", "b", "c", "d", "e", "f", "g", "h"]
+    lines.append("    " + ", ".join(names) + " = H")
+    for i in range(64):
+        a, b, c, d, e, f, g, h = names
+        S1 = f"(({_rotr(e, 6)} ^ {_rotr(e, 11)} ^ {_rotr(e, 25)}) & {_M})"
+        S0 = f"(({_rotr(a, 2)} ^ {_rotr(a, 13)} ^ {_rotr(a, 22)}) & {_M})"
+        ch = f"({g} ^ ({e} & ({f} ^ {g})))"
+        maj = f"(({a} & {b}) | ({c} & ({a} | {b})))"
+        lines.append(f"    t = {h} + {S1} + {ch} + {_SHA256_K[i]:#010x} + w{i}")
+        lines.append(f"    {d} = ({d} + t) & {_M}")
+        lines.append(f"    {h} = (t + {S0} + {maj}) & {_M}")
+        names = [h, a, b, c, d, e, f, g]
+
+    # 64 rounds bring every role back to its original name
+    for i, name in enumerate(names):
+        lines.append(f"    H[{i}] = (H[{i}] + {name}) & {_M}")
+    return "\n".join(lines) + "\n"
+
+
+# RIPEMD-160 selection functions per group of 16 rounds, as source templates
+_RIPEMD160_F = [
+    "({x} ^ {y} ^ {z})",
+    "({z} ^ ({x} & ({y} ^ {z})))",
+    "(({x} | ({y} ^ 0xffffffff)) ^ {z})",
+    "({y} ^ ({z} & ({x} ^ {y})))",
+    "({x} ^ ({y} | ({z} ^ 0xffffffff)))",
+]
+_RIPEMD160_KL = [0x00000000, 0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xA953FD4E]
+_RIPEMD160_KR = [0x50A28BE6, 0x5C4DD124, 0x6D703EF3, 0x7A6D76E9, 0x00000000]
+
+def _ripemd160_round(names, f, k, x, s):
+    """Source lines for one round of one line, and the renamed roles"""
+    a, b, c, d, e = names
+    added = f"{a} + {f.format(x=b, y=c, z=d)} + x{x}" + (f" + {k:#010x}" if k else "")
+    lines = [
+        f"    t = ({added}) & {_M}",
+        f"    {a} = ({_rotl('t', s)} + {e}) & {_M}",
+        f"    {c} = {_rotl(c, 10)}",
+    ]
+    # A' = E, B' = T (stored in the old A), C' = B, D' = rotl(C), E' = D
+    return lines, [e, a, b, c, d]
+
+def generate_ripemd160_source() -> str:
+    """Return the source of the unrolled RIPEMD-160 compression function"""
+    lines = [
+        "def _ripemd160_compress(H, chunk):",
+        "    " + ", ".join(f"x{i}" for i in range(16)) + " = _unpack_le(chunk)",
+    ]
+    left = ["al", "bl", "cl", "dl", "el"]
+    right = ["ar", "br", "cr", "dr", "er"]
+    lines.append("    " + ", ".join(left) + " = H")
+    lines.append("    " + ", ".join(right) + " = H")
+    for j in range(80):
+        group = j // 16
+        round_lines, left = _ripemd160_round(
+            left, _RIPEMD160_F[group], _RIPEMD160_KL[group], _RIPEMD160_R[j], _RIPEMD160_S[j])
+        lines += round_lines
+        round_lines, right = _ripemd160_round(
+            right, _RIPEMD160_F[4 - group], _RIPEMD160_KR[group], _RIPEMD160_RP[j], _RIPEMD160_SP[j])
+        lines += round_lines
+
+    # 80 rounds bring every role back to its original name
+    al, bl, cl, dl, el = left
+    ar, br, cr, dr, er = right
+    lines += [
+        f"    t = (H[1] + {cl} + {dr}) & {_M}",
+        f"    H[1] = (H[2] + {dl} + {er}) & {_M}",
+        f"    H[2] = (H[3] + {el} + {ar}) & {_M}",
+        f"    H[3] = (H[4] + {al} + {br}) & {_M}",
+        f"    H[4] = (H[0] + {bl} + {cr}) & {_M}",
+        "    H[0] = t",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _compile(source, name):
+    namespace = {
+        "_unpack_be": struct.Struct(">16I").unpack,
+        "_unpack_le": struct.Struct("<16I").unpack,
+    }
+    exec(compile(source, f"<generated {name}>", "exec"), namespace)
+    return namespace[name]
+
+_sha256_compress = _compile(generate_sha256_source(), "_sha256_compress")
+_ripemd160_compress = _compile(generate_ripemd160_source(), "_ripemd160_compress")
+
+
+class SHA256(_BlockHash):
+    """Incremental SHA-256 using the unrolled compression function"""
+    name = 'sha256'
+    digest_size = 32
+    _H0 = _SHA256_H0
+    _compress = staticmethod(_sha256_compress)
+    _padding = staticmethod(_sha256_padding)
+    _byteorder = 'big'
+
+
+class RIPEMD160(_BlockHash):
+    """Incremental RIPEMD-160 using the unrolled compression function"""
+    name = 'ripemd160'
+    digest_size = 20
+    _H0 = _RIPEMD160_H0
+    _compress = staticmethod(_ripemd160_compress)
+    _padding = staticmethod(_ripemd160_padding)
+    _byteorder = 'little'
+
+
+def sha256(data: bytes) -> bytes:
+    return SHA256(data).digest()
+
+def ripemd160(data: bytes) -> bytes:
+    return RIPEMD160(data).digest()
+
+def sha256_midstate(prefix: bytes):
+    return SHA256(prefix)
+
+def sha256_batch(messages, midstate=None):
+    """hash_functions.sha256_batch, with the unrolled code for small groups"""
+    return _sha256_batch(messages, midstate if midstate is not None else SHA256())
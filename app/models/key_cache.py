@@ -0,0 +1,185 @@
+import ecdsa
+from ecdsa import ellipticcurve
+import threading
+from collections import OrderedDict
+from .hash_backends import ripemd160
+from .util import sha256
+
+# Approximate memory of a cached key: the parsed point, the key bytes and
+# the address; and of the precomputation table of a hot key (SECP256k1)
+KEY_ENTRY_BYTES = 1024
+PRECOMPUTED_TABLE_BYTES = 48 * 1024
+
+
+def derive_address(pubkey_bytes: bytes) -> str:
+    """Address of raw public key bytes: RIPEMD-160 of their SHA-256, in hex"""
+    return ripemd160(sha256(pubkey_bytes)).hex()
+
+
+def precomputed_verifying_key(verifying_key):
+    """Copy of verifying_key with the multiplication table of its point built.
+
+    python-ecdsa only builds such tables for points that know the curve
+    order, which keys parsed from bytes do not, so the point is rebuilt with
+    it. Verification with the table is about twice as fast.
+    """
+    curve = verifying_key.curve
+    point = verifying_key.pubkey.point
+    point = ellipticcurve.PointJacobi(curve.curve, point.x(), point.y(), 1, curve.order, generator=True)
+    point * 2  # Tables are built lazily, on the first multiplication
+    return ecdsa.VerifyingKey.from_public_point(
+        point, curve=curve, hashfunc=verifying_key.default_hashfunc, validate_point=False
+    )
+
+class PublicKeyCache:
+    """Bounded LRU cache of public key bytes -> (address, parsed VerifyingKey).
+
+    Deriving an address costs a SHA-256 and a RIPEMD-160 and parsing a key
+    costs a point decoding, so both are done once per key and shared by
+    wallets, transaction verification and the API routes.
+
+    Keys looked up precompute_after times (frequent senders) get a
+    precomputed multiplication table. The cache stays within memory_budget
+    bytes, as estimated with KEY_ENTRY_BYTES and PRECOMPUTED_TABLE_BYTES, by
+    evicting the least recently used keys.
+    """
+    def __init__(self, max_entries=4096, memory_budget=32 * 1024 * 1024, precompute_after=16):
+        self.max_entries = max_entries
+        self.memory_budget = memory_budget
+        self.precompute_after = precompute_after
+        self._entries = OrderedDict()  # key bytes -> [address, VerifyingKey, lookups, precomputed]
+        self._lock = threading.Lock()
+        self.memory = 0
+        self.precomputed = 0
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, pubkey_bytes: bytes):
+        """Return (address, VerifyingKey) for raw SECP256k1 public key bytes.
+
+        Raises the ecdsa error if the bytes are not a valid public key;
+        invalid keys are never cached.
+        """
+        pubkey_bytes = bytes(pubkey_bytes)
+        with self._lock:
+            entry = self._entries.get(pubkey_bytes)
+            if entry is not None:
+                self._entries.move_to_end(pubkey_bytes)
+                self.hits += 1
+                entry[2] += 1
+                if entry[3] or entry[2] != self.precompute_after:
+                    return entry[0], entry[1]
+                verifying_key = entry[1]
+            else:
+                self.misses += 1
+
+        if entry is not None:
+            # Hot key: build its table outside the lock, then swap it in
+            hot_key = precomputed_verifying_key(verifying_key)
+            with self._lock:
+                if self._entries.get(pubkey_bytes) is entry and not entry[3]:
+                    entry[1] = hot_key
+                    entry[3] = True
+                    self.precomputed += 1
+                    self.memory += PRECOMPUTED_TABLE_BYTES
+                    self._evict()
+            return entry[0], hot_key
+
+        verifying_key = ecdsa.VerifyingKey.from_string(pubkey_bytes, curve=ecdsa.SECP256k1)
+        address = derive_address(pubkey_bytes)
+
+        with self._lock:
+            if pubkey_bytes not in self._entries:
+                self._entries[pubkey_bytes] = [address, verifying_key, 1, False]
+                self.memory += KEY_ENTRY_BYTES
+                self._evict()
+        return address, verifying_key
+
+    def _evict(self):
+        """Drop least recently used keys until the count and memory limits hold"""
+        while self._entries and (len(self._entries) > self.max_entries or self.memory > self.memory_budget):
+            _, entry = self._entries.popitem(last=False)
+            self.memory -= KEY_ENTRY_BYTES
+            if entry[3]:
+                self.memory -= PRECOMPUTED_TABLE_BYTES
+                self.precomputed -= 1
+
+    def address(self, pubkey_bytes: bytes) -> str:
+        return self.lookup(pubkey_bytes)[0]
+
+    def verifying_key(self, pubkey_bytes: bytes):
+        return self.lookup(pubkey_bytes)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.memory = 0
+            self.precomputed = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "precomputed": self.precomputed,
+                "memory_bytes": self.memory,
+                "memory_budget": self.memory_budget,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+class SignatureCache:
+    """Bounded LRU set of signatures already verified successfully.
+
+    Entries are keyed by (signed transaction hash, signature, public key), so
+    a hit means this exact signature was valid for this exact transaction
+    data and key. Failed verifications are never recorded.
+    """
+    def __init__(self, max_entries=65536):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def contains(self, key) -> bool:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, key):
+        with self._lock:
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+# Shared by every wallet, transaction and route of the node
+public_keys = PublicKeyCache()
+# Shared by mempool admission and any later re-verification of a transaction
+verified_signatures = SignatureCache()
@@ -0,0 +1,232 @@
+from collections import OrderedDict
+from itertools import islice
+import json
+import threading
+from .transaction import Transaction, transaction_id
+
+
+class MempoolFull(Exception):
+    """Raised when a transaction does not fit in the mempool limits"""
+
+
+def transaction_size(tx) -> int:
+    """Serialized size of a transaction dict in bytes (its canonical JSON)"""
+    return len(json.dumps(tx, sort_keys=True).encode())
+
+
+def _amount(tx):
+    amount = tx.get("amount", 0)
+    return amount if isinstance(amount, (int, float)) and not isinstance(amount, bool) else 0
+
+
+class Mempool:
+    """Pending transactions, indexed by transaction id and by address.
+
+    Transactions keep their arrival order. For every address the mempool
+    keeps the net amount of its pending transactions (received minus sent),
+    so pending balance checks do not scan the pool.
+
+    `added` counts every transaction ever added and `generation` changes
+    whenever transactions are removed, so readers such as the block template
+    can tell an append from any other change.
+
+    With max_transactions or max_bytes (serialized size) set, a full
+    mempool rejects new transactions with MempoolFull; nothing already
+    pending is evicted, so transactions are mined first come, first served.
+    """
+    def __init__(self, max_transactions=None, max_bytes=None):
+        self.max_transactions = max_transactions
+        self.max_bytes = max_bytes
+        self._transactions = OrderedDict()  # txid -> transaction dict
+        self._sizes = {}  # txid -> serialized size
+        self._by_address = {}  # address -> {txid: None} it sends or receives, in order
+        self._deltas = {}  # address -> pending received - sent
+        self.bytes = 0
+        self.added = 0
+        self.generation = 0
+        # Routes, gossip and background mining jobs share the pool
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._transactions)
+
+    def __contains__(self, txid):
+        return txid in self._transactions
+
+    def __iter__(self):
+        return iter(self.transactions())
+
+    def get(self, txid):
+        return self._transactions.get(txid)
+
+    def transactions(self) -> list:
+        with self._lock:
+            return list(self._transactions.values())
+
+    def items_since(self, count, limit=None):
+        """(txid, transaction, size) of the transactions after the first
+        `count` ones, at most `limit` of them"""
+        with self._lock:
+            stop = None if limit is None else count + limit
+            return [(txid, tx, self._sizes[txid])
+                    for txid, tx in islice(self._transactions.items(), count, stop)]
+
+    def check_room(self, size):
+        """Raise MempoolFull unless a transaction of `size` bytes fits"""
+        if self.max_transactions is not None and len(self._transactions) >= self.max_transactions:
+            raise MempoolFull(f"Mempool is full ({self.max_transactions} transactions)")
+        if self.max_bytes is not None and self.bytes + size > self.max_bytes:
+            raise MempoolFull(f"Mempool is full ({self.max_bytes} bytes)")
+
+    def add(self, tx, txid=None, size=None):
+        """Add a transaction (dict or Transaction).
+
+        Returns its id, or None if a transaction with the same id is pending.
+        Raises MempoolFull if it does not fit in the limits.
+        """
+        if isinstance(tx, Transaction):
+            tx = tx.to_dict()
+        txid = txid or transaction_id(tx)
+        size = size or transaction_size(tx)
+        amount = _amount(tx)
+        with self._lock:
+            if txid in self._transactions:
+                return None
+            self.check_room(size)
+            self._transactions[txid] = tx
+            self._sizes[txid] = size
+            self.bytes += size
+            for address, delta in ((tx.get("sender_address"), -amount), (tx.get("receiver_address"), amount)):
+                if address is None:
+                    continue
+                self._by_address.setdefault(address, {})[txid] = None
+                self._deltas[address] = self._deltas.get(address, 0) + delta
+            self.added += 1
+        return txid
+
+    def _discard(self, txid):
+        tx = self._transactions.pop(txid, None)
+        if tx is None:
+            return False
+        self.bytes -= self._sizes.pop(txid)
+        amount = _amount(tx)
+        for address, delta in ((tx.get("sender_address"), -amount), (tx.get("receiver_address"), amount)):
+            txids = self._by_address.get(address)
+            if txids is None:
+                continue
+            txids.pop(txid, None)
+            if txids:
+                self._deltas[address] -= delta
+            else:
+                del self._by_address[address]
+                del self._deltas[address]
+        return True
+
+    def remove(self, txids) -> int:
+        """Remove the given ids (e.g. the transactions of a new block).
+
+        Returns the number of transactions removed; unknown ids are ignored.
+        """
+        with self._lock:
+            removed = sum(1 for txid in txids if self._discard(txid))
+            if removed:
+                self.generation += 1
+        return removed
+
+    def replace(self, transactions):
+        """Drop every pending transaction and add `transactions` instead,
+        oldest first, until the mempool is full"""
+        with self._lock:
+            self.clear()
+            for tx in transactions:
+                try:
+                    self.add(tx)
+                except MempoolFull:
+                    break
+
+    def clear(self):
+        with self._lock:
+            self._transactions.clear()
+            self._sizes.clear()
+            self.bytes = 0
+            self._by_address.clear()
+            self._deltas.clear()
+            self.generation += 1
+
+    def pending_delta(self, address) -> float:
+        """Net amount of pending transactions for address (received - sent)"""
+        with self._lock:
+            return self._deltas.get(address, 0)
+
+    def for_address(self, address) -> list:
+        """Pending transactions sent or received by address, in arrival order"""
+        with self._lock:
+            return [self._transactions[txid] for txid in self._by_address.get(address, ())]
+
+
+class SeenTransactions:
+    """Bounded set of the most recent transaction ids this node has handled.
+
+    Gossip echoes a transaction back from every peer it reached; checking
+    the id here drops those copies before any signature verification or
+    mempool work. The oldest ids are forgotten first once max_entries is
+    reached, which only costs a re-verification if one arrives that late.
+    """
+    def __init__(self, max_entries=65536):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def __contains__(self, txid):
+        with self._lock:
+            return txid in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def contains(self, txid) -> bool:
+        """Like `txid in seen`, but a hit counts as a dropped duplicate"""
+        with self._lock:
+            if txid in self._entries:
+                self.duplicates += 1
+                return True
+            return False
+
+    def add(self, txid) -> bool:
+        """Record txid; returns False (and counts a duplicate) if it was already seen"""
+        with self._lock:
+            if txid in self._entries:
+                self.duplicates += 1
+                return False
+            self._entries[txid] = None
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def discard(self, txid):
+        with self._lock:
+            self._entries.pop(txid, None)
+
+    def update(self, txids):
+        """Record txids (e.g. the transactions of a new block); ids already
+        seen are refreshed, not counted as duplicates"""
+        with self._lock:
+            for txid in txids:
+                self._entries[txid] = None
+                self._entries.move_to_end(txid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.duplicates = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "duplicates": self.duplicates
+            }
@@ -0,0 +1,87 @@
+from .util import sha256
+
+# Root of a block without transactions
+EMPTY_ROOT = bytes(32)
+
+def merkle_parent(left: bytes, right: bytes) -> bytes:
+    return sha256(left + right)
+
+
+class MerkleTree:
+    """Merkle tree over a list of 32-byte leaf hashes.
+
+    Pairs are hashed level by level with SHA-256; a level with an odd number
+    of nodes pairs its last node with itself. All levels are kept so
+    inclusion proofs can be produced without rehashing.
+    """
+    def __init__(self, leaves):
+        self.leaves = list(leaves)
+        self._positions = {}
+        for position, leaf in enumerate(self.leaves):
+            self._positions.setdefault(leaf, position)
+
+        self.levels = [self.leaves]
+        level = self.leaves
+        while len(level) > 1:
+            if len(level) % 2:
+                level = level + [level[-1]]
+            level = [merkle_parent(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+            self.levels.append(level)
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0] if self.leaves else EMPTY_ROOT
+
+    def position(self, leaf: bytes):
+        """Index of the first occurrence of leaf, or None"""
+        return self._positions.get(leaf)
+
+    def proof(self, position: int) -> list:
+        """Inclusion proof for the leaf at position.
+
+        Returns a list of {"hash": hex, "side": "left" | "right"} from the
+        leaf level up; side tells where the sibling goes when hashing.
+        """
+        if not 0 <= position < len(self.leaves):
+            raise IndexError("leaf position out of range")
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = position ^ 1
+            if sibling >= len(level):
+                sibling = position  # Odd level: last node paired with itself
+            proof.append({
+                "hash": level[sibling].hex(),
+                "side": "left" if sibling < position else "right"
+            })
+            position //= 2
+        return proof
+
+
+def merkle_root(leaves) -> bytes:
+    """Merkle root of a list of 32-byte leaf hashes"""
+    return MerkleTree(leaves).root
+
+def verify_merkle_proof(leaf_hex: str, proof: list, root_hex: str) -> bool:
+    """Check an inclusion proof produced by MerkleTree.proof.
+
+    Args:
+        leaf_hex: Leaf hash (a transaction id) in hex
+        proof: List of {"hash": hex, "side": "left" | "right"}
+        root_hex: Expected Merkle root in hex
+
+    Returns:
+        True if hashing the leaf up the proof yields the root
+    """
+    try:
+        node = bytes.fromhex(leaf_hex)
+        for step in proof:
+            sibling = bytes.fromhex(step["hash"])
+            if step["side"] == "left":
+                node = merkle_parent(sibling, node)
+            elif step["side"] == "right":
+                node = merkle_parent(node, sibling)
+            else:
+                return False
+        return node.hex() == root_hex.lower()
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return False
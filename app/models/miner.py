@@ -0,0 +1,134 @@
+import multiprocessing
+import queue
+import time
+from . import hash_backends
+from .block import nonce_encoder
+
+# Nonces per scan when the hash backend is not batch accelerated: small
+# enough to stop quickly, large enough to amortize the stop check
+UNACCELERATED_CHUNK = 64
+
+
+def scan_nonces(midstate, suffix, target, start, count, encode_nonce):
+    """Hash nonces start .. start+count-1 and return the first valid one.
+
+    Args:
+        midstate: hash_backends.sha256_midstate() of the block prefix
+        suffix: Serialized block bytes that follow the nonce
+        target: Largest valid hash as an integer (block.target)
+        start: First nonce to try
+        count: Number of consecutive nonces to try in one sha256_batch call
+        encode_nonce: block.nonce_encoder(version) of the block being mined
+
+    Returns:
+        (nonce, hex hash) or None if no nonce in the range is valid
+    """
+    nonces = range(start, start + count)
+    digests = hash_backends.sha256_batch([encode_nonce(n) + suffix for n in nonces], midstate)
+    for nonce, digest in zip(nonces, digests):
+        if int.from_bytes(digest, 'big') <= target:
+            return nonce, digest.hex()
+    return None
+
+
+def _mine_worker(worker_id, workers, prefix, suffix, version, target, backend, chunk, stop, results):
+    """Scan chunks worker_id, worker_id + workers, ... until a hit or stop is set.
+
+    Always reports exactly once on the results queue.
+    """
+    hash_backends.set_backend(backend)
+    midstate = hash_backends.sha256_midstate(prefix)
+    encode_nonce = nonce_encoder(version)
+    hashes = 0
+    found = None
+    start_time = time.time()
+    chunk_index = worker_id
+    while found is None and not stop.is_set():
+        found = scan_nonces(midstate, suffix, target, chunk_index * chunk, chunk, encode_nonce)
+        hashes += chunk
+        chunk_index += workers
+    elapsed = time.time() - start_time
+    results.put({
+        "worker": worker_id,
+        "nonce": found[0] if found else None,
+        "hash": found[1] if found else None,
+        "hashes": hashes,
+        "elapsed": elapsed
+    })
+
+
+def mine_parallel(block, workers, batch_size, should_stop=None):
+    """Search the nonce of block with a pool of worker processes.
+
+    The nonce space is split into chunks dealt round-robin to the workers.
+    The first worker to find a valid hash sets a shared stop event and every
+    worker reports how many hashes it computed. Workers that die without
+    reporting are left out of the stats once a hash is found.
+
+    Args:
+        block: Block with index, transactions, previous_hash, timestamp and
+            target set
+        workers: Number of processes
+        batch_size: Nonces per chunk when the backend is batch accelerated
+        should_stop: Optional callable polled while waiting; when it returns a
+            truthy value every worker is stopped and None is returned
+
+    Returns:
+        dict with 'nonce', 'hash' and 'workers' (per-worker hashes, elapsed
+        time and hashrate), or None if should_stop cancelled the search
+    """
+    prefix, suffix = block.mining_message_parts()
+    backend = hash_backends.get_backend()
+    chunk = batch_size if backend.batch_accelerated else UNACCELERATED_CHUNK
+
+    ctx = multiprocessing.get_context()
+    stop = ctx.Event()
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(
+            target=_mine_worker,
+            args=(worker_id, workers, prefix, suffix, block.version, block.target, backend.name, chunk, stop, results),
+            daemon=True
+        )
+        for worker_id in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    reports = []
+    winner = None
+    try:
+        while len(reports) < workers:
+            if winner is None and should_stop and should_stop():
+                stop.set()
+                return None
+            try:
+                report = results.get(timeout=0.1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    if winner is not None:
+                        break  # A worker died without reporting; keep the block found
+                    raise RuntimeError("Mining workers exited without reporting a result")
+                continue
+            reports.append(report)
+            if report["nonce"] is not None and winner is None:
+                winner = report
+                stop.set()
+    finally:
+        stop.set()
+        for process in processes:
+            process.join()
+
+    return {
+        "nonce": winner["nonce"],
+        "hash": winner["hash"],
+        "workers": [
+            {
+                "worker": r["worker"],
+                "hashes": r["hashes"],
+                "elapsed": round(r["elapsed"], 2),
+                "hashrate": round(r["hashes"] / r["elapsed"], 2) if r["elapsed"] else 0
+            }
+            for r in sorted(reports, key=lambda r: r["worker"])
+        ]
+    }
@@ -1,8 +1,35 @@
-import ecdsa
 import json
-from .hash_functions import ripemd160
+import multiprocessing
+from .key_cache import public_keys, verified_signatures
 from .util import hash_dict, b64decode, sha256
 
+# Fewer unchecked signatures than this are verified in-process by
+# verify_signatures: starting the pool costs more than checking them
+PARALLEL_VERIFY_MIN_TRANSACTIONS = 64
+
+def transaction_id(tx) -> str:
+    """Id of a transaction as stored in blocks: SHA-256 of its canonical JSON.
+
+    Accepts a Transaction or its dict form, including coinbase/faucet dicts.
+    """
+    if isinstance(tx, Transaction):
+        tx = tx.to_dict()
+    return hash_dict(tx)
+
+def normalized_transaction(tx) -> dict:
+    """Dict form of a transaction as kept in the mempool and in blocks.
+
+    Signed transactions keep only the Transaction fields: the signature
+    does not cover anything else, so extra keys must not give the same
+    payment another id. Coinbase/faucet dicts are kept as given.
+    Raises ValueError for a dict missing a required field.
+    """
+    if isinstance(tx, Transaction):
+        return tx.to_dict()
+    if isinstance(tx, dict) and tx.get("sender_address") in (None, "COINBASE", "FAUCET"):
+        return tx
+    return Transaction.from_dict(tx).to_dict()
+
 class Transaction:
     def __init__(self, sender_address, sender_pubkey, receiver_address, amount, signature=None):
         self.sender_address = sender_address
@@ -20,6 +47,10 @@ class Transaction:
             "signature": self.signature
         }
     
+    @property
+    def txid(self) -> str:
+        return transaction_id(self)
+
     def to_hash(self):
         # Build a deterministic byte representation for signing/verifying
         transaction_copy = {
@@ -37,23 +68,37 @@ class Transaction:
         return self.signature
 
     def verify_signature(self) -> bool:
+        """Check the signature and that the public key matches the sender.
+
+        Successful checks are remembered in verified_signatures, so a
+        transaction received again (gossip, blocks) is not re-verified.
+        """
         try:
+            cache_key = self._signature_key()
+            message = cache_key[0]
+            if verified_signatures.contains(cache_key):
+                return True
+
             # sender_pubkey is expected to be a base64-encoded public key string
             pubkey_bytes = b64decode(self.sender_pubkey)
-            pubkey = ecdsa.VerifyingKey.from_string(pubkey_bytes, curve=ecdsa.SECP256k1)
+            # Parsed key and derived address come from the shared cache
+            address, pubkey = public_keys.lookup(pubkey_bytes)
 
-            # Recompute address from provided public key and compare
-            sha = sha256(pubkey_bytes)
-            ripemd_hash = ripemd160(sha)
-            if ripemd_hash.hex() != self.sender_address:
+            # Compare the address derived from the provided public key
+            if address != self.sender_address:
                 return False
 
             signature = b64decode(self.signature)
-            pubkey.verify(signature, self.to_hash())
+            pubkey.verify(signature, message)
+            verified_signatures.add(cache_key)
             return True
         except Exception:
             return False
 
+    def _signature_key(self):
+        """Key of this signature check in verified_signatures"""
+        return (self.to_hash(), self.signature, self.sender_pubkey)
+
     @classmethod
     def from_dict(cls, data: dict):
         """Create a Transaction from a dict/JSON payload.
@@ -75,4 +120,44 @@ class Transaction:
             receiver_address=data["receiver_address"],
             amount=data["amount"],
             signature=data.get("signature")
-        )
\ No newline at end of file
+        )
+
+
+def _verify_shard(payloads):
+    """verify_signature() of transaction dicts in a worker process"""
+    return [Transaction.from_dict(data).verify_signature() for data in payloads]
+
+def verify_signatures(transactions, workers=1) -> list:
+    """verify_signature() of many Transactions, in order.
+
+    Signatures already in verified_signatures are answered here. With
+    workers > 1 and at least PARALLEL_VERIFY_MIN_TRANSACTIONS left, the rest
+    are split into one shard per worker process, and the successes are
+    added to this process's cache so later checks (add_new_transaction)
+    hit it.
+    """
+    results = [None] * len(transactions)
+    pending = []
+    for i, tx in enumerate(transactions):
+        if verified_signatures.contains(tx._signature_key()):
+            results[i] = True
+        else:
+            pending.append(i)
+
+    workers = min(workers, len(pending))
+    if workers <= 1 or len(pending) < PARALLEL_VERIFY_MIN_TRANSACTIONS:
+        for i in pending:
+            results[i] = transactions[i].verify_signature()
+        return results
+
+    bounds = [len(pending) * n // workers for n in range(workers + 1)]
+    shards = [[transactions[i].to_dict() for i in pending[first:last]]
+              for first, last in zip(bounds, bounds[1:])]
+    ctx = multiprocessing.get_context()
+    with ctx.Pool(workers) as pool:
+        shard_results = pool.map(_verify_shard, shards)
+    for i, valid in zip(pending, (valid for shard in shard_results for valid in shard)):
+        results[i] = valid
+        if valid:
+            verified_signatures.add(transactions[i]._signature_key())
+    return results
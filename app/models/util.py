@@ -1,4 +1,4 @@
-from .hash_functions import sha256 as custom_sha256
+from . import hash_backends
 import json
 import base64
 import time 
@@ -12,10 +12,10 @@ def to_json(obj) -> str:
 
 def sha256(data: bytes) -> bytes:
     '''
-    Deterministic SHA256 hash from bytes using custom implementation
+    Deterministic SHA256 hash from bytes using the active hash backend
     returns hash in bytes
     '''
-    return custom_sha256(data)
+    return hash_backends.sha256(data)
 
 def hash_dict(data: dict) -> str:
     '''
@@ -23,7 +23,15 @@ def hash_dict(data: dict) -> str:
     returns hash in hex string
     '''
     encoded = json.dumps(data, sort_keys=True).encode()
-    return custom_sha256(encoded).hex()
+    return hash_backends.sha256(encoded).hex()
+
+def hash_dicts(items: list) -> list:
+    '''
+    Use the backend sha256_batch to hash many dictionaries at once
+    returns list of hashes in hex string, same as hash_dict for each item
+    '''
+    encoded = [json.dumps(data, sort_keys=True).encode() for data in items]
+    return [digest.hex() for digest in hash_backends.sha256_batch(encoded)]
 
 def b64encode(byte_string: bytes) -> str:
     return base64.b64encode(byte_string).decode()
@@ -1,6 +1,6 @@
 import ecdsa
-from .hash_functions import ripemd160
-from .util import sha256, b64encode
+from .key_cache import public_keys
+from .util import b64encode
 
 class Wallet:
     def __init__(self, private_key_pem=None):
@@ -9,15 +9,17 @@ class Wallet:
         else:
             self.private_key = ecdsa.SigningKey.generate(curve=ecdsa.SECP256k1)
         self.public_key = self.private_key.get_verifying_key()
+        self._pem = None
 
     def to_pem(self):
-        return self.private_key.to_pem().decode()
+        # Every save writes all wallets, so the encoding is kept
+        if self._pem is None:
+            self._pem = self.private_key.to_pem().decode()
+        return self._pem
     
     @property
     def get_address(self) -> str:
-        sha = sha256(self.public_key.to_string())
-        ripemd = ripemd160(sha)
-        return ripemd.hex()
+        return public_keys.address(self.public_key.to_string())
 
     def sign(self, message: bytes) -> str:
         return b64encode(self.private_key.sign(message))
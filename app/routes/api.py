@@ -1,13 +1,32 @@
-from flask import Blueprint, jsonify, request, current_app
-from app.models.wallet import Wallet
-from app.models.transaction import Transaction
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context
+from app.models.transaction import Transaction, verify_signatures
+from app.models import hash_backends
+from app.models.key_cache import public_keys, verified_signatures
+from app.models.util import b64decode
 from app.instance import blockchain, wallets, peers
-from app.services.save_service import save_wallets, save_blockchain
+from app.models.blockchain import MiningCancelled
+from app.models.mempool import MempoolFull
+from app.models.block_template import coinbase_transaction
+from app.models.block import HEADER_VERSION
+from app.models.difficulty import bits_to_target
+from app.services.save_service import save_wallets, save_blockchain, save_checkpoint
+from app.services import mining_service
+from app.services.wallet_pool import keypairs
 import base64
+import json
+import os
 import requests
+import uuid
 
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 
+# Largest number of transactions accepted by /transactions/batch
+MAX_BATCH_TRANSACTIONS = 1000
+# Largest number of wallets created by one /wallets/bulk call
+MAX_BULK_WALLETS = 1000
+# Largest page of /wallet/<address>/transactions
+MAX_HISTORY_PAGE = 100
+
 def get_port():
     return current_app.config.get("NODE_PORT")
 
@@ -66,8 +85,7 @@ def broadcast_block(new_block):
 def create_wallet():
     """Create a new wallet and return its address and public key."""
     try:
-        wallet = Wallet()
-        address = wallet.get_address
+        wallet, address = keypairs.take()[0]
         pubkey = base64.b64encode(wallet.public_key.to_string()).decode()
         
         # Store wallet in memory and save to disk
@@ -82,6 +100,39 @@ def create_wallet():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@api_bp.route("/wallets/bulk", methods=["POST"])
+def create_wallets_bulk():
+    """Create many wallets in one call, saved to disk once."""
+    try:
+        data = request.get_json() or {}
+        count = data.get("count")
+        if not isinstance(count, int) or isinstance(count, bool) or not 1 <= count <= MAX_BULK_WALLETS:
+            return jsonify({
+                "success": False,
+                "error": f"count must be an integer between 1 and {MAX_BULK_WALLETS}"
+            }), 400
+
+        created = []
+        for wallet, address in keypairs.take(count):
+            wallets[address] = wallet
+            created.append({
+                "address": address,
+                "public_key": base64.b64encode(wallet.public_key.to_string()).decode()
+            })
+        save_wallets(str(get_port()), wallets)
+
+        return jsonify({"success": True, "count": len(created), "wallets": created}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@api_bp.route("/wallets/pool", methods=["GET"])
+def get_wallet_pool():
+    """Get the state of the pre-generated keypair pool."""
+    try:
+        return jsonify({"success": True, "pool": keypairs.stats()}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @api_bp.route("/wallet/<address>", methods=["DELETE"])
 def delete_wallet(address):
     """Delete a wallet from the server."""
@@ -98,18 +149,10 @@ def delete_wallet(address):
 
 @api_bp.route("/wallet/balance/<address>", methods=["GET"])
 def get_balance(address):
-    """Calculate balance for a given address by scanning the blockchain."""
+    """Get the balance of an address from the mined blocks."""
     try:
-        balance = 0
-        
-        # Scan all blocks for transactions involving this address
-        for block in blockchain.chain:
-            for tx in block.transactions:
-                if isinstance(tx, dict):
-                    if tx.get("receiver_address") == address:
-                        balance += tx.get("amount", 0)
-                    if tx.get("sender_address") == address:
-                        balance -= tx.get("amount", 0)
+        # Kept up to date block by block, no chain scan
+        balance = blockchain.balances.balance(address)
         
         return jsonify({
             "success": True,
@@ -119,38 +162,122 @@ def get_balance(address):
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@api_bp.route("/wallet/<address>/transactions", methods=["GET"])
+def get_address_transactions(address):
+    """List the mined transactions of an address, newest first.
+
+    Query parameters: limit (1 to MAX_HISTORY_PAGE, default 20) and cursor,
+    the next_cursor of the previous page.
+    """
+    try:
+        limit = request.args.get("limit", 20)
+        try:
+            limit = int(limit)
+            if not 1 <= limit <= MAX_HISTORY_PAGE:
+                raise ValueError
+        except ValueError:
+            return jsonify({"success": False, "error": f"limit must be between 1 and {MAX_HISTORY_PAGE}"}), 400
+
+        cursor = request.args.get("cursor")
+        before = None
+        if cursor:
+            try:
+                height, position = (int(part) for part in cursor.split(":"))
+                before = (height, position)
+            except ValueError:
+                return jsonify({"success": False, "error": "Invalid cursor"}), 400
+
+        transactions = []
+        # One extra location tells whether an older page exists. The blocks
+        # come with the locations, so a concurrent sync cannot mix two chains
+        entries, total = blockchain.history.page_blocks(address, limit + 1, before)
+        for (height, position), block in entries[:limit]:
+            transactions.append({
+                "txid": block.merkle_tree.leaves[position].hex(),
+                "block_index": block.index,
+                "block_hash": block.hash,
+                "timestamp": block.timestamp,
+                "position": position,
+                "transaction": block.transactions[position]
+            })
+
+        next_cursor = None
+        if len(entries) > limit:
+            height, position = entries[limit - 1][0]
+            next_cursor = f"{height}:{position}"
+
+        return jsonify({
+            "success": True,
+            "address": address,
+            "total": total,
+            "transactions": transactions,
+            "next_cursor": next_cursor
+        }), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+def build_signed_transaction(data):
+    """Transaction for a /transaction payload, signed by the server wallet
+    or carrying the client's signature.
+
+    Returns (transaction, None), or (None, error message) for an invalid payload.
+    """
+    if not isinstance(data, dict):
+        return None, "Transaction must be a JSON object"
+
+    # Validate required fields
+    required_fields = ["sender_address", "sender_pubkey", "receiver_address", "amount"]
+    for field in required_fields:
+        if field not in data:
+            return None, f"Missing field: {field}"
+
+    sender_address = data["sender_address"]
+    amount = data["amount"]
+    if not isinstance(amount, (int, float)) or isinstance(amount, bool):
+        return None, "Amount must be a number"
+
+    # Reject a public key that does not derive the sender address early
+    try:
+        pubkey_address = public_keys.address(b64decode(data["sender_pubkey"]))
+    except Exception:
+        return None, "Invalid sender public key"
+    if pubkey_address != sender_address:
+        return None, "Public key does not match sender address"
+
+    # Create transaction
+    transaction = Transaction(
+        sender_address=sender_address,
+        sender_pubkey=data["sender_pubkey"],
+        receiver_address=data["receiver_address"],
+        amount=amount
+    )
+
+    # Sign transaction if we have the wallet
+    if sender_address in wallets:
+        transaction.sign(wallets[sender_address])
+    elif "signature" in data:
+        # Use provided signature
+        transaction.signature = data["signature"]
+    else:
+        return None, "No signature provided and wallet not found in server"
+    return transaction, None
+
 @api_bp.route("/transaction", methods=["POST"])
 def create_transaction():
     """Create and add a new transaction to the pending pool."""
     try:
         data = request.get_json()
         
-        # Validate required fields
-        required_fields = ["sender_address", "sender_pubkey", "receiver_address", "amount"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"success": False, "error": f"Missing field: {field}"}), 400
-        
-        sender_address = data["sender_address"]
-        amount = data["amount"]
+        transaction, error = build_signed_transaction(data)
+        if error:
+            return jsonify({"success": False, "error": error}), 400
         
-        # Check sender balance
-        balance = 0
-        for block in blockchain.chain:
-            for tx in block.transactions:
-                if isinstance(tx, dict):
-                    if tx.get("receiver_address") == sender_address:
-                        balance += tx.get("amount", 0)
-                    if tx.get("sender_address") == sender_address:
-                        balance -= tx.get("amount", 0)
+        sender_address = transaction.sender_address
+        amount = transaction.amount
         
-        # Check pending transactions
-        for tx in blockchain.unconfirmed_transactions:
-            if isinstance(tx, dict):
-                if tx.get("receiver_address") == sender_address:
-                    balance += tx.get("amount", 0)
-                if tx.get("sender_address") == sender_address:
-                    balance -= tx.get("amount", 0)
+        # Check sender balance, including pending transactions
+        balance = blockchain.confirmed_balances([sender_address])[sender_address]
+        balance += blockchain.mempool.pending_delta(sender_address)
         
         # Validate sufficient balance
         if balance < amount:
@@ -159,28 +286,11 @@ def create_transaction():
                 "error": f"Insufficient balance. Available: {balance} coins, Required: {amount} coins"
             }), 400
         
-        # Create transaction
-        transaction = Transaction(
-            sender_address=sender_address,
-            sender_pubkey=data["sender_pubkey"],
-            receiver_address=data["receiver_address"],
-            amount=amount
-        )
-        
-        # Sign transaction if we have the wallet
-        if sender_address in wallets:
-            transaction.sign(wallets[sender_address])
-        elif "signature" in data:
-            # Use provided signature
-            transaction.signature = data["signature"]
-        else:
-            return jsonify({
-                "success": False,
-                "error": "No signature provided and wallet not found in server"
-            }), 400
-        
         # Add to blockchain
-        success = blockchain.add_new_transaction(transaction.to_dict())
+        try:
+            success = blockchain.add_new_transaction(transaction.to_dict())
+        except MempoolFull as e:
+            return jsonify({"success": False, "error": str(e)}), 503
         
         if success:
             broadcast_unconfirmed_transactions(transaction.to_dict())
@@ -198,6 +308,88 @@ def create_transaction():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@api_bp.route("/transactions/batch", methods=["POST"])
+def create_transactions_batch():
+    """Add many transactions at once, with one result per item.
+
+    Signatures are verified in bulk (across `workers` processes for large
+    batches), sender balances are read in a single pass over the chain and
+    the accepted transactions are sent to peers in a single broadcast.
+    Items are applied in order, so a transaction may spend coins received
+    earlier in the same batch.
+    """
+    try:
+        data = request.get_json() or {}
+        items = data.get("transactions")
+        if not isinstance(items, list) or not items:
+            return jsonify({"success": False, "error": "transactions must be a non-empty list"}), 400
+        if len(items) > MAX_BATCH_TRANSACTIONS:
+            return jsonify({
+                "success": False,
+                "error": f"At most {MAX_BATCH_TRANSACTIONS} transactions per batch"
+            }), 400
+        workers = data.get("workers", 1)
+        if not isinstance(workers, int) or isinstance(workers, bool) or workers < 1:
+            return jsonify({"success": False, "error": "workers must be a positive integer"}), 400
+        workers = min(workers, os.cpu_count() or 1)
+
+        results = [None] * len(items)
+        candidates = []  # (index, transaction, txid) left after the cheap checks
+        for i, item in enumerate(items):
+            transaction, error = build_signed_transaction(item)
+            if error:
+                results[i] = {"index": i, "success": False, "error": error}
+                continue
+            txid = transaction.txid
+            if txid in blockchain.seen_transactions:
+                results[i] = {"index": i, "success": False, "txid": txid, "error": "Duplicate transaction"}
+                continue
+            candidates.append((i, transaction, txid))
+
+        valid = verify_signatures([transaction for _, transaction, _ in candidates], workers)
+
+        balances = blockchain.confirmed_balances({transaction.sender_address for _, transaction, _ in candidates})
+        for address in balances:
+            balances[address] += blockchain.mempool.pending_delta(address)
+
+        accepted = []
+        for (i, transaction, txid), signature_ok in zip(candidates, valid):
+            sender, amount = transaction.sender_address, transaction.amount
+            if not signature_ok:
+                results[i] = {"index": i, "success": False, "txid": txid, "error": "Transaction verification failed"}
+                continue
+            if balances[sender] < amount:
+                results[i] = {
+                    "index": i, "success": False, "txid": txid,
+                    "error": f"Insufficient balance. Available: {balances[sender]} coins, Required: {amount} coins"
+                }
+                continue
+            try:
+                added = blockchain.add_new_transaction(transaction.to_dict(), txid)
+            except MempoolFull as e:
+                results[i] = {"index": i, "success": False, "txid": txid, "error": str(e)}
+                continue
+            if not added:
+                results[i] = {"index": i, "success": False, "txid": txid, "error": "Transaction rejected"}
+                continue
+            balances[sender] -= amount
+            if transaction.receiver_address in balances:
+                balances[transaction.receiver_address] += amount
+            accepted.append(transaction.to_dict())
+            results[i] = {"index": i, "success": True, "txid": txid}
+
+        if accepted:
+            broadcast_unconfirmed_transactions(accepted)
+        return jsonify({
+            "success": True,
+            "accepted": len(accepted),
+            "rejected": len(items) - len(accepted),
+            "results": results
+        }), 200
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @api_bp.route("/mine", methods=["POST"])
 def mine_block():
     """Mine pending transactions into a new block with optional mining reward."""
@@ -205,8 +397,31 @@ def mine_block():
     try:
         data = request.get_json() or {}
         miner_address = data.get("miner_address")
+        workers = data.get("workers", 1)
+        if not isinstance(workers, int) or isinstance(workers, bool) or workers < 1:
+            return jsonify({"success": False, "error": "workers must be a positive integer"}), 400
+        workers = min(workers, os.cpu_count() or 1)
         
-        result = blockchain.mine(miner_address=miner_address, mining_reward=50)
+        if data.get("async"):
+            # Mine in the background; the block is saved and broadcast when found
+            job, created = mining_service.start_job(
+                miner_address=miner_address,
+                mining_reward=50,
+                workers=workers,
+                on_mined=block_mined_callback(current_app._get_current_object(), port)
+            )
+            if not created:
+                return jsonify({
+                    "success": False,
+                    "error": "A mining job is already running",
+                    "job_id": job.id
+                }), 409
+            return jsonify({"success": True, "job_id": job.id, "status": job.status}), 202
+        
+        try:
+            result = blockchain.mine(miner_address=miner_address, mining_reward=50, workers=workers)
+        except MiningCancelled as e:
+            return jsonify({"success": False, "error": f"Mining cancelled: {e}"}), 409
         
         if result:
             message = f"Block #{result['index']} mined successfully"
@@ -220,7 +435,9 @@ def mine_block():
                 "block_index": result['index'],
                 "mining_time": result['mining_time'],
                 "difficulty": result['difficulty'],
-                "mining_reward": 50 if miner_address else 0
+                "mining_reward": 50 if miner_address else 0,
+                "hashrate": result['hashrate'],
+                "workers": result['workers']
             }), 200
         else:
             return jsonify({
@@ -231,6 +448,30 @@ def mine_block():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+def block_mined_callback(app, port):
+    """Save and broadcast a block mined by a background job"""
+    def on_mined(result):
+        with app.app_context():
+            save_blockchain(port)
+            broadcast_block(blockchain.chain[result['index']].to_dict())
+    return on_mined
+
+@api_bp.route("/mine/jobs/<job_id>", methods=["GET"])
+def get_mining_job(job_id):
+    """Get the status of a background mining job."""
+    job = mining_service.get_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Mining job not found"}), 404
+    return jsonify({"success": True, **job.to_dict()}), 200
+
+@api_bp.route("/mine/jobs/<job_id>", methods=["DELETE"])
+def cancel_mining_job(job_id):
+    """Cancel a background mining job."""
+    job = mining_service.cancel_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Mining job not found"}), 404
+    return jsonify({"success": True, "job_id": job.id, "message": "Cancellation requested"}), 200
+
 @api_bp.route("/faucet", methods=["POST"])
 def request_faucet():
     """Request free coins from the faucet."""
@@ -252,11 +493,16 @@ def request_faucet():
             "sender_pubkey": None,
             "receiver_address": address,
             "amount": faucet_amount,
-            "signature": None
+            "signature": None,
+            # Identical faucet requests would otherwise share a transaction id
+            "nonce": uuid.uuid4().hex
         }
         
         # Add to pending transactions
-        success = blockchain.add_new_transaction(faucet_transaction)
+        try:
+            success = blockchain.add_new_transaction(faucet_transaction)
+        except MempoolFull as e:
+            return jsonify({"success": False, "error": str(e)}), 503
         
         if success:
             broadcast_unconfirmed_transactions(faucet_transaction)
@@ -283,12 +529,15 @@ def get_blockchain():
         
         for block in blockchain.chain:
             chain_data.append({
+                "version": block.version,
                 "index": block.index,
                 "timestamp": block.timestamp,
                 "transactions": block.transactions,
                 "nonce": block.nonce,
                 "hash": block.hash,
                 "previous_hash": block.previous_hash,
+                "merkle_root": block.merkle_root.hex() if block.version >= HEADER_VERSION else None,
+                "bits": getattr(block, 'bits', None),
                 "difficulty": block.difficulty if hasattr(block, 'difficulty') else 4,
                 "mining_time": block.mining_time if hasattr(block, 'mining_time') else 0
             })
@@ -302,14 +551,61 @@ def get_blockchain():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@api_bp.route("/transaction/<txid>/proof", methods=["GET"])
+def get_transaction_proof(txid):
+    """Get a Merkle inclusion proof for a confirmed transaction.
+
+    The response carries the block header, so a client holding only headers
+    can check sha256(header) == block_hash, read the Merkle root from the
+    header and verify the proof with merkle.verify_merkle_proof.
+    """
+    try:
+        try:
+            if len(bytes.fromhex(txid)) != 32:
+                raise ValueError
+        except ValueError:
+            return jsonify({"success": False, "error": "Invalid transaction id"}), 400
+        txid = txid.lower()
+
+        for block in reversed(blockchain.chain):
+            found = block.merkle_proof(txid)
+            if found is None:
+                continue
+            if block.version < HEADER_VERSION:
+                return jsonify({
+                    "success": False,
+                    "error": f"Block #{block.index} is a legacy block without a Merkle root"
+                }), 422
+
+            position, proof = found
+            return jsonify({
+                "success": True,
+                "txid": txid,
+                "block_index": block.index,
+                "block_hash": block.hash,
+                "header": block.header().hex(),
+                "merkle_root": block.merkle_root.hex(),
+                "position": position,
+                "proof": proof
+            }), 200
+
+        return jsonify({"success": False, "error": "Transaction not found in the blockchain"}), 404
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @api_bp.route("/transactions/pending", methods=["GET"])
 def get_pending_transactions():
     """Get all pending (unconfirmed) transactions."""
     try:
+        pending = blockchain.unconfirmed_transactions
         return jsonify({
             "success": True,
-            "count": len(blockchain.unconfirmed_transactions),
-            "transactions": blockchain.unconfirmed_transactions
+            "count": len(pending),
+            "bytes": blockchain.mempool.bytes,
+            "max_transactions": blockchain.mempool.max_transactions,
+            "max_bytes": blockchain.mempool.max_bytes,
+            "transactions": pending
         }), 200
         
     except Exception as e:
@@ -320,38 +616,136 @@ def get_mining_stats():
     """Get current mining statistics."""
     try:
         current_difficulty = blockchain.get_difficulty()
+        next_bits = blockchain.next_bits()
         total_blocks = len(blockchain.chain)
-        blocks_until_next = blockchain.blocks_until_next_difficulty()
         
-        # Calculate average mining time for last 10 blocks
-        recent_blocks = blockchain.chain[-10:] if len(blockchain.chain) > 10 else blockchain.chain[1:]  # Skip genesis
+        # Calculate average mining time over the retarget window
+        window = blockchain.RETARGET_WINDOW
+        recent_blocks = blockchain.chain[-window:] if len(blockchain.chain) > window else blockchain.chain[1:]  # Skip genesis
         mining_times = [b.mining_time for b in recent_blocks if hasattr(b, 'mining_time') and b.mining_time is not None]
         avg_mining_time = sum(mining_times) / len(mining_times) if mining_times else 0
         
         return jsonify({
             "success": True,
             "current_difficulty": current_difficulty,
+            "bits": next_bits,
+            "target": f"{bits_to_target(next_bits):064x}",
             "total_blocks": total_blocks,
-            "blocks_until_next_difficulty": blocks_until_next,
             "average_mining_time": round(avg_mining_time, 2),
-            "difficulty_increment_interval": blockchain.DIFFICULTY_INCREMENT_INTERVAL
+            "block_interval": blockchain.BLOCK_INTERVAL,
+            "retarget_window": window
         }), 200
         
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@api_bp.route("/mining/template", methods=["GET"])
+def get_mining_template():
+    """Get the block template the node would mine next.
+
+    With ?miner_address=... the template includes the 50 coin coinbase
+    transaction. A nonce is valid when sha256(header with the nonce as its
+    last 8 bytes, big endian) read as an integer is <= target.
+    """
+    try:
+        miner_address = request.args.get("miner_address")
+        template = blockchain.block_template()
+        coinbase = coinbase_transaction(miner_address, 50) if miner_address else None
+        block = template.build(coinbase)
+
+        return jsonify({
+            "success": True,
+            "version": block.version,
+            "index": block.index,
+            "previous_hash": block.previous_hash,
+            "timestamp": block.timestamp,
+            "bits": block.bits,
+            "target": f"{block.target:064x}",
+            "difficulty": block.difficulty,
+            "merkle_root": block.merkle_root.hex(),
+            "header": block.header(nonce=0).hex(),
+            "transaction_count": len(block.transactions),
+            "transactions": block.transactions,
+            "txids": [leaf.hex() for leaf in block.merkle_tree.leaves]
+        }), 200
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @api_bp.route("/blockchain/validate", methods=["GET"])
 def validate_blockchain():
-    """Validate the integrity of the blockchain."""
+    """Validate the integrity of the blockchain.
+
+    Only blocks above the validated-height checkpoint are checked, unless
+    ?full=true forces a complete re-validation. Long ranges are validated
+    on every core.
+    """
     try:
-        validation_result = blockchain.validate_chain()
+        full = request.args.get("full", "").lower() in ("1", "true", "yes")
+        checkpoint = blockchain.checkpoint
+        validation_result = blockchain.validate_chain(full=full, workers=os.cpu_count() or 1)
+        if blockchain.checkpoint != checkpoint:
+            save_checkpoint(get_port())
         
         return jsonify({
             "success": True,
             "valid": validation_result['valid'],
             "total_blocks": validation_result['total_blocks'],
+            "checked_blocks": validation_result['checked_blocks'],
+            "validated_height": blockchain.checkpoint["height"] if blockchain.checkpoint else None,
             "errors": validation_result['errors']
         }), 200
         
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
+
+@api_bp.route("/blockchain/validate/stream", methods=["GET"])
+def validate_blockchain_stream():
+    """Validate the blockchain, streaming NDJSON progress records.
+
+    Query parameters: full=true re-validates every block, stop_on_error=true
+    stops at the first error and max_errors=N after N errors. The last line
+    is the result record.
+    """
+    full = request.args.get("full", "").lower() in ("1", "true", "yes")
+    max_errors = request.args.get("max_errors")
+    if request.args.get("stop_on_error", "").lower() in ("1", "true", "yes"):
+        max_errors = 1
+    try:
+        max_errors = int(max_errors) if max_errors is not None else None
+        if max_errors is not None and max_errors < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({"success": False, "error": "max_errors must be a positive integer"}), 400
+
+    port = get_port()
+
+    def generate():
+        checkpoint = blockchain.checkpoint
+        for record in blockchain.validate_chain_stream(full=full, max_errors=max_errors):
+            yield json.dumps(record) + "\n"
+        if blockchain.checkpoint != checkpoint:
+            save_checkpoint(port)
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+@api_bp.route("/hash/stats", methods=["GET"])
+def get_hash_stats():
+    """Get the active hash backend and its cross-check results."""
+    try:
+        return jsonify({"success": True, **hash_backends.get_stats()}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@api_bp.route("/cache/stats", methods=["GET"])
+def get_cache_stats():
+    """Get hit/miss counters of the node caches."""
+    try:
+        return jsonify({
+            "success": True,
+            "public_keys": public_keys.stats(),
+            "signatures": verified_signatures.stats(),
+            "seen_transactions": blockchain.seen_transactions.stats()
+        }), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
@@ -3,6 +3,9 @@ import requests
 from app.instance import peers, blockchain
 from app.services.save_service import save_blockchain
 from app.models.block import Block
+from app.models.mempool import MempoolFull
+from app.models.transaction import normalized_transaction, transaction_id
+import os
 
 main_bp = Blueprint("main", __name__)
 
@@ -16,6 +19,24 @@ def update_list_peers(new_peers):
     global peers
     peers |= set(new_peers)
 
+def add_gossiped_transaction(tx):
+    """Add a transaction received from a peer.
+
+    Returns None for a transaction already seen (an echo of our own
+    broadcast or a copy relayed by another peer), dropped before its
+    signature is checked; otherwise the result of add_new_transaction.
+    """
+    try:
+        txid = transaction_id(normalized_transaction(tx))
+    except Exception:
+        return False
+    if blockchain.seen_transactions.contains(txid):
+        return None
+    try:
+        return blockchain.add_new_transaction(tx, txid)
+    except MempoolFull:
+        return False
+
 def update_list_un_tx(new_txs):
     for new_tx in new_txs:
         blockchain.add_new_transaction(new_tx)
@@ -34,7 +55,7 @@ def sync_blockchain():
             # Basic format validation
             if isinstance(remote_chain, dict) and isinstance(remote_chain.get('chain'), list):
                 try:
-                    blockchain.load_from_dict(remote_chain)
+                    blockchain.load_from_dict(remote_chain, validate=True, workers=os.cpu_count() or 1)
                     save_blockchain(str(get_port()))
                     print("Blockchain synchronized with bootstrap")
                 except Exception as e:
@@ -115,18 +136,24 @@ def update_unconfirmed_transactions():
     # Accept either a single transaction (dict) or a list of transactions
     if isinstance(un_tx, (list, set, tuple)):
         failures = []
+        duplicates = 0
         for tx in un_tx:
-            ok = blockchain.add_new_transaction(tx)
-            if not ok:
+            ok = add_gossiped_transaction(tx)
+            if ok is None:
+                duplicates += 1
+            elif not ok:
                 failures.append(tx)
 
         if failures:
             return jsonify({"message": "Some transactions failed to add", "failed_count": len(failures)}), 400
-        return jsonify({"message": "Transactions added successfully", "count": len(un_tx)}), 200
+        return jsonify({"message": "Transactions added successfully", "count": len(un_tx) - duplicates,
+                        "duplicates": duplicates}), 200
 
     else:
         # single transaction
-        result = blockchain.add_new_transaction(un_tx)
+        result = add_gossiped_transaction(un_tx)
+        if result is None:
+            return jsonify({"message": "Transaction already known"}), 200
         if result:
             return jsonify({"message": "Transaction added successfuly"}), 200
         return jsonify({"message": "Fail add transaction"}), 400
@@ -139,9 +166,8 @@ def update_block():
     proof = getattr(block, 'hash', None) or block.compute_hash()
     result = blockchain.add_block(block, proof)
     if result:
+        # add_block already dropped the transactions this block confirmed
         save_blockchain(str(get_port()))
-        blockchain.unconfirmed_transactions = []
-        # Optionally clear pending transactions (they should be filtered by block content elsewhere)
         return jsonify({"message": "Block added successfuly"}), 200
     return jsonify({"message": "Fail add block"}), 400
 
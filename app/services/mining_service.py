@@ -0,0 +1,132 @@
+# Background mining jobs: /api/mine can return immediately with a job id
+from app.instance import blockchain
+from app.models.blockchain import MiningCancelled
+from app.models.util import timestamp
+import threading
+import uuid
+
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 100
+# Latest restarts kept in the history of a job
+MAX_JOB_RESTARTS = 100
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+class MiningJob:
+    """A mining run executed in a background thread.
+
+    The job mines on top of the current tip. When the tip changes (a peer
+    block was accepted or the chain was replaced) or new transactions arrive,
+    the running proof of work is cancelled and the job restarts on the new
+    state, so no work is wasted on a stale block.
+    """
+    def __init__(self, miner_address, mining_reward, workers, on_mined=None):
+        self.id = uuid.uuid4().hex
+        self.miner_address = miner_address
+        self.mining_reward = mining_reward
+        self.workers = workers
+        self.on_mined = on_mined
+        self.status = "queued"
+        self.created = timestamp()
+        self.finished = None
+        self.restarts = []
+        self.restart_count = 0
+        self.result = None
+        self.error = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def active(self):
+        return self.status in ("queued", "running")
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _stop_reason(self):
+        return "cancelled by request" if self._cancel.is_set() else None
+
+    def _run(self):
+        self.status = "running"
+        try:
+            while True:
+                try:
+                    result = blockchain.mine(
+                        miner_address=self.miner_address,
+                        mining_reward=self.mining_reward,
+                        workers=self.workers,
+                        restart_on_new_transactions=True,
+                        should_stop=self._stop_reason
+                    )
+                except MiningCancelled as e:
+                    if self._cancel.is_set():
+                        self.status = "cancelled"
+                        return
+                    self.restart_count += 1
+                    self.restarts.append({"reason": str(e), "at": timestamp()})
+                    del self.restarts[:-MAX_JOB_RESTARTS]
+                    continue
+
+                if not result:
+                    self.status = "failed"
+                    self.error = "No transactions to mine"
+                    return
+                self.result = result
+                self.status = "completed"
+                if self.on_mined:
+                    self.on_mined(result)
+                return
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+        finally:
+            self.finished = timestamp()
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "miner_address": self.miner_address,
+            "workers": self.workers,
+            "created": self.created,
+            "finished": self.finished,
+            "restarts": self.restarts,
+            "restart_count": self.restart_count,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+def start_job(miner_address=None, mining_reward=50, workers=1, on_mined=None):
+    """Start a background mining job, unless one is already running.
+
+    Returns:
+        (job, created) where created is False if an active job was returned
+    """
+    with _jobs_lock:
+        for job in _jobs.values():
+            if job.active:
+                return job, False
+
+        job = MiningJob(miner_address, mining_reward, workers, on_mined)
+        _jobs[job.id] = job
+
+        # Forget the oldest finished jobs
+        finished = [j for j in _jobs.values() if not j.active]
+        for old in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del _jobs[old.id]
+
+    job._thread.start()
+    return job, True
+
+def get_job(job_id):
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+def cancel_job(job_id):
+    job = get_job(job_id)
+    if job is not None:
+        job.cancel()
+    return job
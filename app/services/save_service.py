@@ -7,6 +7,12 @@ import os
 
 WALLETS_FILE = "wallets.json"
 BLOCKCHAIN_FILE = "blockchain.json"
+CHECKPOINT_FILE = "checkpoint.json"
+
+# Format of blockchain.json:
+#   1 - a bare list of block dicts (blocks without 'version' are legacy blocks)
+#   2 - {"format_version": 2, "chain": [...]}
+BLOCKCHAIN_FORMAT_VERSION = 2
 
 def get_peer_directory(port):
     dir = f"data/{port}"
@@ -23,6 +29,11 @@ def get_block_file(port):
     os.makedirs(dir, exist_ok=True)
     return os.path.join(dir, BLOCKCHAIN_FILE)
 
+def get_checkpoint_file(port):
+    dir = f"data/{port}"
+    os.makedirs(dir, exist_ok=True)
+    return os.path.join(dir, CHECKPOINT_FILE)
+
 def load_wallets(port):
     wallets_file = get_walles_file(port)
     loaded_wallets = {}
@@ -64,7 +75,25 @@ def save_blockchain(port):
         blockchain_data.append(blk)
 
     with open(blockchain_file, 'w') as f:
-        json.dump(blockchain_data, f, indent=4)
+        json.dump({"format_version": BLOCKCHAIN_FORMAT_VERSION, "chain": blockchain_data}, f, indent=4)
+    save_checkpoint(port)
+
+def save_checkpoint(port):
+    """Saves the validated-height checkpoint of the blockchain."""
+    with open(get_checkpoint_file(port), 'w') as f:
+        json.dump(blockchain.checkpoint, f)
+
+def load_checkpoint(port):
+    """Loads the saved validated-height checkpoint, or None."""
+    checkpoint_file = get_checkpoint_file(port)
+    if not os.path.exists(checkpoint_file):
+        return None
+    try:
+        with open(checkpoint_file, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading checkpoint: {e}")
+        return None
 
 def load_blockchain(port):
     """Loads the blockchain from a JSON file."""
@@ -74,6 +103,10 @@ def load_blockchain(port):
         
     with open(blockchain_file, 'r') as f:
         blockchain_data = json.load(f)
+    
+    # Migrate format 1 files (a bare list of blocks)
+    if isinstance(blockchain_data, dict):
+        blockchain_data = blockchain_data.get("chain", [])
         
     new_blockchain = []
     for block_data in blockchain_data:    
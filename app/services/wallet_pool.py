@@ -0,0 +1,74 @@
+# Keypairs generated ahead of time, so creating wallets does not wait for
+# key generation and address derivation
+from app.models.key_cache import derive_address
+from app.models.wallet import Wallet
+from collections import deque
+import threading
+
+# Keypairs kept ready by the background thread
+DEFAULT_DEPTH = 64
+
+
+def generate_keypair():
+    """New (wallet, address) pair.
+
+    The address is derived directly rather than through the shared public
+    key cache, so bulk creation does not evict the keys of active senders.
+    """
+    wallet = Wallet()
+    return wallet, derive_address(wallet.public_key.to_string())
+
+
+class KeyPool:
+    """Pool of pre-generated (wallet, address) pairs.
+
+    Once started, a background thread tops the pool up to `depth` pairs
+    whenever wallets are taken. take() generates inline whatever the pool
+    cannot supply, so callers never wait for the thread.
+    """
+    def __init__(self, depth=DEFAULT_DEPTH):
+        self.depth = depth
+        self._ready = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self.from_pool = 0
+        self.generated_inline = 0
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while len(self._ready) >= self.depth:
+                    self._cond.wait()
+            keypair = generate_keypair()
+            with self._cond:
+                self._ready.append(keypair)
+
+    def take(self, count=1) -> list:
+        """count (wallet, address) pairs, pre-generated ones first"""
+        with self._cond:
+            keypairs = [self._ready.popleft() for _ in range(min(count, len(self._ready)))]
+            self.from_pool += len(keypairs)
+            self.generated_inline += count - len(keypairs)
+            self._cond.notify()
+        keypairs.extend(generate_keypair() for _ in range(count - len(keypairs)))
+        return keypairs
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "ready": len(self._ready),
+                "depth": self.depth,
+                "running": self._thread is not None,
+                "from_pool": self.from_pool,
+                "generated_inline": self.generated_inline
+            }
+
+
+# Shared by the wallet routes; started by run.py
+keypairs = KeyPool()
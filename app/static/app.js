@@ -404,11 +404,11 @@ async function loadMiningStats() {
             const avgTimeStr = formatMiningTime(data.average_mining_time);
             document.getElementById('avgMiningTime').textContent = avgTimeStr;
 
-            // Update blocks remaining
-            document.getElementById('blocksRemaining').textContent = data.blocks_until_next_difficulty;
+            // Update target block time
+            document.getElementById('blocksRemaining').textContent = `${avgTimeStr} / ${formatMiningTime(data.block_interval)}`;
 
-            // Update progress bar
-            const progress = ((data.difficulty_increment_interval - data.blocks_until_next_difficulty) / data.difficulty_increment_interval) * 100;
+            // Update progress bar (average mining time against the target interval)
+            const progress = Math.min(100, (data.average_mining_time / data.block_interval) * 100);
             document.getElementById('difficultyProgressBar').style.width = progress + '%';
         }
     } catch (error) {
@@ -0,0 +1,216 @@
+"""
+Crypto microbenchmarks with regression thresholds.
+
+Measures throughput of the hash functions (every hash backend, several
+message sizes), util.hash_dict and Block.compute_hash on realistic block
+payloads, Wallet.sign and Transaction.verify_signature, and ECDSA
+verification with a key parsed on every call, a cached key and a cached key
+with a precomputed table. Results are written as JSON and compared against a
+baseline recorded on the same machine (it is not committed, absolute ops/s
+only compare on one machine):
+
+    python bench_crypto.py                    # run, write bench_results.json, compare
+    python bench_crypto.py --save-baseline    # record bench_baseline.json
+    python bench_crypto.py --tolerance 0.3    # allow 30% slowdown before failing
+
+Exits with status 1 when any benchmark in the baseline got slower than the
+tolerance allows.
+"""
+import argparse
+import ecdsa
+import json
+import os
+import platform
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.models import hash_backends
+from app.models.block import Block
+from app.models.key_cache import public_keys, verified_signatures, precomputed_verifying_key
+from app.models.transaction import Transaction
+from app.models.util import hash_dict, b64encode
+from app.models.wallet import Wallet
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BASE_DIR, "bench_baseline.json")
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, "bench_results.json")
+
+# Bump when a benchmark changes what it measures; baselines recorded with
+# another suite version are not compared
+SUITE_VERSION = 2
+
+MESSAGE_SIZES = [64, 1024, 16384]
+BLOCK_SIZES = [1, 10, 100]  # Transactions per block
+
+
+def measure(func, min_time, nbytes=None):
+    """Call func repeatedly for at least min_time seconds.
+
+    Returns a result dict with ops/s (and MB/s when nbytes is given).
+    """
+    func()  # Warm up caches before timing
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    result = {"ops_per_sec": round(calls / elapsed, 3), "calls": calls}
+    if nbytes is not None:
+        result["bytes"] = nbytes
+        result["mb_per_sec"] = round(nbytes * calls / elapsed / 1e6, 4)
+    return result
+
+
+def make_transactions(count):
+    """Signed transactions between a few wallets, as stored in blocks"""
+    wallets = [Wallet() for _ in range(4)]
+    transactions = []
+    for i in range(count):
+        sender, receiver = wallets[i % 4], wallets[(i + 1) % 4]
+        tx = Transaction(
+            sender_address=sender.get_address,
+            sender_pubkey=b64encode(sender.public_key.to_string()),
+            receiver_address=receiver.get_address,
+            amount=i + 1
+        )
+        tx.sign(sender)
+        transactions.append(tx)
+    return transactions
+
+
+def run(min_time):
+    results = {}
+
+    for backend in hash_backends.available_backends():
+        impl = hash_backends._backends[backend]
+        for size in MESSAGE_SIZES:
+            data = os.urandom(size)
+            results[f"hash.{backend}.sha256.{size}"] = measure(lambda: impl.sha256(data), min_time, size)
+            results[f"hash.{backend}.ripemd160.{size}"] = measure(lambda: impl.ripemd160(data), min_time, size)
+
+    transactions = make_transactions(max(BLOCK_SIZES))
+    tx_dicts = [tx.to_dict() for tx in transactions]
+    for count in BLOCK_SIZES:
+        block = Block(1, tx_dicts[:count], "0" * 64, difficulty=3)
+        payload = {
+            'index': block.index,
+            'transactions': block.transactions,
+            'timestamp': block.timestamp,
+            'previous_hash': block.previous_hash,
+            'nonce': block.nonce
+        }
+        nbytes = len(json.dumps(payload, sort_keys=True).encode())
+        results[f"util.hash_dict.block_{count}tx"] = measure(lambda: hash_dict(payload), min_time, nbytes)
+        results[f"block.compute_hash.{count}tx"] = measure(block.compute_hash, min_time, nbytes)
+
+    wallet = Wallet()
+    message = transactions[0].to_hash()
+    results["wallet.sign"] = measure(lambda: wallet.sign(message), min_time)
+    tx = transactions[0]
+    results["transaction.verify_signature"] = measure(tx.verify_signature, min_time)
+
+    # Verification of a new signature, i.e. without the signature cache
+    def verify_uncached():
+        verified_signatures.clear()
+        public_keys.clear()
+        return tx.verify_signature()
+
+    def verify_known_sender():
+        verified_signatures.clear()
+        return tx.verify_signature()
+
+    results["transaction.verify_signature.new_sender"] = measure(verify_uncached, min_time)
+    public_keys.clear()
+    results["transaction.verify_signature.known_sender"] = measure(verify_known_sender, min_time)
+
+    signature = wallet.private_key.sign(message)
+    pubkey = wallet.public_key.to_string()
+    cached_key = ecdsa.VerifyingKey.from_string(pubkey, curve=ecdsa.SECP256k1)
+    hot_key = precomputed_verifying_key(cached_key)
+    results["ecdsa.verify.parsed_each_call"] = measure(
+        lambda: ecdsa.VerifyingKey.from_string(pubkey, curve=ecdsa.SECP256k1).verify(signature, message), min_time)
+    results["ecdsa.verify.cached_key"] = measure(lambda: cached_key.verify(signature, message), min_time)
+    results["ecdsa.verify.precomputed_key"] = measure(lambda: hot_key.verify(signature, message), min_time)
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the list of benchmarks slower than baseline * (1 - tolerance)"""
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        current = results.get(name)
+        if current is None:
+            continue
+        floor = base["ops_per_sec"] * (1 - tolerance)
+        if current["ops_per_sec"] < floor:
+            regressions.append({
+                "name": name,
+                "baseline_ops_per_sec": base["ops_per_sec"],
+                "ops_per_sec": current["ops_per_sec"],
+                "change": round(current["ops_per_sec"] / base["ops_per_sec"] - 1, 4)
+            })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds per benchmark (default 0.3)")
+    parser.add_argument("--backend", default="reference", help="hash backend for the block/util benchmarks")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown fraction (default 0.25)")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    hash_backends.set_backend(args.backend)
+    results = run(args.min_time)
+    report = {
+        "created": int(time.time()),
+        "suite_version": SUITE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "backend": args.backend,
+        "results": results
+    }
+
+    for name, result in results.items():
+        line = f"{name:<40}{result['ops_per_sec']:>14.1f} ops/s"
+        if "mb_per_sec" in result:
+            line += f"{result['mb_per_sec']:>12.4f} MB/s"
+        print(line)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found, run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    if baseline.get("suite_version") != SUITE_VERSION:
+        print("Baseline was recorded with another benchmark suite, re-record it with --save-baseline")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n[FAIL] {len(regressions)} benchmark(s) regressed more than {args.tolerance:.0%}:")
+        for r in regressions:
+            print(f"  {r['name']}: {r['baseline_ops_per_sec']} -> {r['ops_per_sec']} ops/s ({r['change']:+.1%})")
+        return 1
+    print(f"\n[PASS] No benchmark regressed more than {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
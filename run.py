@@ -1,8 +1,11 @@
 from app import create_app
 from app.instance import wallets
-from app.services.save_service import load_wallets, load_blockchain, save_blockchain
+from app.services.save_service import load_wallets, load_blockchain, load_checkpoint, save_blockchain, save_checkpoint
 from app.models.blockchain import Blockchain
+from app.models import hash_backends
+from app.services.wallet_pool import keypairs
 from app.instance import blockchain
+import os
 
 app = create_app()
 
@@ -17,6 +20,27 @@ if __name__ == "__main__":
     app.config["NODE_PORT"] = PORT
     app.config["BOOTSTRAP_PORT"] = bootstrap 
 
+    # Hash backend for this node, e.g. HASH_BACKEND=hashlib HASH_CROSS_CHECK=0.01
+    hash_backends.set_backend(os.environ.get("HASH_BACKEND", "reference"),
+                              float(os.environ.get("HASH_CROSS_CHECK", "0")))
+    print(f"Using hash backend: {hash_backends.get_backend().name}")
+
+    # Size of the blocks mined here and of the mempool, e.g. MAX_BLOCK_TRANSACTIONS=100.
+    # The block limits can only be lowered: larger blocks would be rejected by other nodes
+    if "MAX_BLOCK_TRANSACTIONS" in os.environ:
+        Blockchain.TEMPLATE_MAX_TRANSACTIONS = int(os.environ["MAX_BLOCK_TRANSACTIONS"])
+    if "MAX_BLOCK_BYTES" in os.environ:
+        Blockchain.TEMPLATE_MAX_BYTES = int(os.environ["MAX_BLOCK_BYTES"])
+    for name in ("MAX_MEMPOOL_TRANSACTIONS", "MAX_MEMPOOL_BYTES"):
+        if name in os.environ:
+            setattr(Blockchain, name, int(os.environ[name]))
+    blockchain.mempool.max_transactions = Blockchain.MAX_MEMPOOL_TRANSACTIONS
+    blockchain.mempool.max_bytes = Blockchain.MAX_MEMPOOL_BYTES
+
+    # Keypairs generated in the background for new wallets, e.g. WALLET_POOL_DEPTH=256
+    keypairs.depth = int(os.environ.get("WALLET_POOL_DEPTH", keypairs.depth))
+    keypairs.start()
+
     loaded_wallets = load_wallets(str(PORT))
     wallets.update(loaded_wallets)
 
@@ -25,6 +49,15 @@ if __name__ == "__main__":
         # Assign the loaded chain into the global blockchain instance
         blockchain.chain = loaded_chain
         print("Blockchain loaded from disk")
+        if blockchain.restore_checkpoint(load_checkpoint(str(PORT))):
+            print(f"Blocks validated up to #{blockchain.checkpoint['height']}")
+        # Check the blocks above the checkpoint on every core
+        result = blockchain.validate_chain(workers=os.cpu_count() or 1)
+        if result['valid']:
+            save_checkpoint(str(PORT))
+            print(f"Validated {result['checked_blocks']} blocks")
+        else:
+            print(f"Blockchain on disk is invalid: {len(result['errors'])} errors, first: {result['errors'][0]}")
     else:
         blockchain = Blockchain()
         save_blockchain(PORT)
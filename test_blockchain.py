@@ -0,0 +1,721 @@
+"""
+Test script to verify mining, validation and transaction handling of the blockchain
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.blockchain import Blockchain, MiningCancelled
+from app.models.block import Block, LEGACY_VERSION, HEADER_SIZE
+from app.models.util import hash_dict
+
+def test_block_header_versions():
+    """Test binary header hashing and loading of legacy (JSON-hashed) blocks"""
+    print("Testing block header versions...")
+
+    txs = [{"sender_address": "FAUCET", "sender_pubkey": None, "receiver_address": f"addr{i}",
+            "amount": i, "signature": None} for i in range(5)]
+    block = Block(1, txs, "ab" * 32, difficulty=1)
+    assert len(block.header()) == HEADER_SIZE, f"Header should be {HEADER_SIZE} bytes"
+    proof = Blockchain().proof_of_work(block)
+    assert proof == block.compute_hash(), "Mined hash differs from the header hash"
+    assert block.header()[-8:] == block.nonce.to_bytes(8, 'big'), "Nonce must be the header tail"
+    print(f"[PASS] Header block mined with nonce {block.nonce}")
+
+    # A block saved before headers existed has no 'version' and a JSON hash
+    legacy = block.to_dict()
+    del legacy['version'], legacy['merkle_root']
+    legacy['hash'] = hash_dict({k: legacy[k] for k in ('index', 'transactions', 'timestamp', 'previous_hash', 'nonce')})
+    loaded = Block.from_dict(legacy)
+    assert loaded.version == LEGACY_VERSION, "Blocks without version must load as legacy"
+    assert loaded.compute_hash() == legacy['hash'], "Legacy block hash changed"
+    print("[PASS] Legacy block keeps its JSON hash")
+
+    # Changing a transaction changes the Merkle root and the hash
+    tampered = Block.from_dict(block.to_dict())
+    tampered.transactions = txs[:-1] + [dict(txs[-1], amount=1000)]
+    assert tampered.compute_hash() != block.compute_hash(), "Tampered transactions kept the same hash"
+    assert Block.compute_hashes([loaded, block, tampered]) == [
+        loaded.compute_hash(), block.compute_hash(), tampered.compute_hash()
+    ], "Batch hashes differ from compute_hash"
+    print("[PASS] Merkle root commits to the transactions")
+
+    # A legacy block skips the bits rule, so it may not follow a newer block
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    bc.mine(miner_address="MINER")
+    downgraded = Block(2, txs, bc.last_block.hash, difficulty=0, version=LEGACY_VERSION)
+    assert not bc.add_block(downgraded, downgraded.compute_hash()), "Legacy block accepted on a version 3 tip"
+    downgraded.hash = downgraded.compute_hash()
+    bc.chain.append(downgraded)
+    errors = bc.validate_chain(full=True)['errors']
+    assert any("version" in error for error in errors), f"Version downgrade not detected: {errors}"
+    print("[PASS] Legacy block rejected after a version 3 block")
+
+    # On a chain migrated from before version 3 the tip is legacy; new legacy
+    # blocks are still refused and never count as mined without work
+    genesis = Block(0, [], "0", difficulty=3, version=LEGACY_VERSION)
+    genesis.hash = genesis.compute_hash()
+    bc.chain = [genesis]
+    zero_work = Block(1, txs, genesis.hash, difficulty=0, version=LEGACY_VERSION)
+    while zero_work.compute_hash().startswith("000"):
+        zero_work.nonce += 1
+    assert not bc.add_block(zero_work, zero_work.compute_hash()), "Legacy block accepted on a legacy tip"
+    zero_work.hash = zero_work.compute_hash()
+    bc.chain.append(zero_work)
+    assert not bc.validate_chain(full=True)['valid'], "Legacy block without proof of work validated"
+    print("[PASS] Legacy blocks without difficulty still need proof of work")
+
+    print("[SUCCESS] All block header tests passed!\n")
+
+def test_merkle_proofs():
+    """Test Merkle inclusion proofs for every transaction of a block"""
+    print("Testing Merkle proofs...")
+
+    from app.models.merkle import verify_merkle_proof
+    from app.models.transaction import transaction_id
+
+    for count in (1, 2, 5, 8, 13):
+        txs = [{"sender_address": "FAUCET", "sender_pubkey": None, "receiver_address": f"addr{i}",
+                "amount": i, "signature": None} for i in range(count)]
+        block = Block(1, txs, "ab" * 32)
+        root = block.merkle_root.hex()
+        for tx in txs:
+            txid = transaction_id(tx)
+            position, proof = block.merkle_proof(txid)
+            assert txs[position] == tx, "Proof points at the wrong transaction"
+            assert len(proof) == (count - 1).bit_length(), f"Proof of {len(proof)} steps for {count} leaves"
+            assert verify_merkle_proof(txid, proof, root), f"Valid proof rejected ({count} leaves)"
+        if count > 1:
+            proof[0]["hash"] = "00" * 32
+            assert not verify_merkle_proof(txid, proof, root), "Tampered proof accepted"
+    print("[PASS] Proofs verify for odd and even leaf counts")
+
+    assert block.merkle_proof("ff" * 32) is None, "Unknown txid should have no proof"
+    print("[PASS] Unknown transaction has no proof")
+
+    print("[SUCCESS] All Merkle proof tests passed!\n")
+
+def test_duplicate_transactions_rejected():
+    """Test that repeating the last transaction (same Merkle root) is rejected"""
+    print("Testing duplicate transaction rejection...")
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    for i in range(2):
+        bc.mempool.add({"sender_address": "FAUCET", "sender_pubkey": None, "receiver_address": "alice",
+                        "amount": 10, "signature": None, "nonce": i})
+    block = bc.block_template().build({"sender_address": "COINBASE", "sender_pubkey": None,
+                                       "receiver_address": "MINER", "amount": 50, "signature": None})
+    proof = bc.proof_of_work(block)
+    honest = list(block.transactions)
+    block.transactions = honest + [honest[-1]]
+    assert block.compute_hash() == proof, "Duplicating the odd last leaf should keep the hash"
+    assert not bc.add_block(block, proof), "Block with a duplicated transaction accepted"
+    assert bc.balances.balance("alice") == 0, "Rejected block changed balances"
+    print("[PASS] add_block rejects duplicated transactions")
+
+    block.transactions = honest
+    assert bc.add_block(block, proof), "Honest block rejected"
+    block.transactions = honest + [honest[-1]]
+    data = bc.to_dict()
+    result = bc.validate_chain(full=True)
+    assert not result['valid'] and "duplicate transactions" in result['errors'][0], f"Unexpected result: {result}"
+    try:
+        Blockchain().load_from_dict(data, validate=True)
+        assert False, "Chain with a duplicated transaction loaded"
+    except ValueError:
+        pass
+    print("[PASS] Chain validation rejects duplicated transactions")
+
+    print("[SUCCESS] All duplicate transaction tests passed!\n")
+
+def _mine_at(bc, block_timestamp):
+    """Mine the template block of bc with the given header timestamp"""
+    from app.models.block_template import coinbase_transaction
+
+    block = bc.block_template().build(coinbase_transaction("MINER", 50))
+    block.timestamp = block_timestamp
+    proof = bc.proof_of_work(block)
+    assert bc.add_block(block, proof), f"Block with timestamp {block_timestamp} rejected"
+    return block
+
+def test_difficulty_retarget():
+    """Test compact targets and retargeting from header timestamps"""
+    print("Testing difficulty retargeting...")
+
+    from app.models.difficulty import bits_to_target, target_to_bits, target_from_zeros
+
+    for zeros in range(0, 20):
+        target = target_from_zeros(zeros)
+        decoded = bits_to_target(target_to_bits(target))
+        assert decoded <= target and decoded >= target - (target >> 15), f"Bits round trip too lossy for {zeros} zeros"
+    print("[PASS] Compact bits round trip")
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    bc.BLOCK_INTERVAL = 2
+    bc.RETARGET_WINDOW = 2
+    start = bc.last_block.timestamp
+    for seconds in (10, 11, 12):  # One second apart, twice as fast as wanted
+        _mine_at(bc, start + seconds)
+    average = (bc.chain[2].target + bc.chain[3].target) // 2
+    faster = bits_to_target(bc.next_bits())
+    assert abs(faster * 2 - average) <= average >> 15, "Target should halve when blocks are twice too fast"
+    print(f"[PASS] Target halved, difficulty {bc.get_difficulty()}")
+
+    # mining_time is not part of the header, so it must not affect the target
+    bc.last_block.mining_time = 1000.0
+    assert bits_to_target(bc.next_bits()) == faster, "Target follows the unhashed mining_time"
+    block = _mine_at(bc, start + 13)
+    assert block.bits == target_to_bits(faster), "Mined block does not use the retargeted bits"
+    assert bc.validate_chain(full=True)['valid'], f"Retargeted chain is invalid: {bc.validate_chain()['errors']}"
+    print(f"[PASS] Block #{block.index} mined and validated with retargeted bits")
+
+    bc.chain[3].bits += 1  # Alters the expected target of the next block
+    assert not bc.validate_chain(full=True)['valid'], "Wrong bits were not detected"
+    print("[PASS] Wrong bits detected")
+
+    # Timestamps drive retargeting, so they may not go back nor run ahead
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    block = _mine_at(bc, bc.last_block.timestamp + 10)
+    for bad_timestamp in (block.timestamp - 1, block.timestamp + 3600 * 24 * 365 * 100):
+        late = bc.block_template().build()
+        late.timestamp = bad_timestamp
+        assert not bc.add_block(late, bc.proof_of_work(late)), f"Timestamp {bad_timestamp} accepted"
+    print("[PASS] Timestamps before the previous block or in the future rejected")
+
+    ahead = _mine_at(bc, block.timestamp + 30)  # A peer clock slightly ahead
+    result = bc.mine(miner_address="MINER")
+    assert result and bc.last_block.timestamp >= ahead.timestamp, "Block mined after a future-dated one rejected"
+    print("[PASS] Templates are never dated before the previous block")
+
+    chain = bc.to_dict()['chain'][:2]
+    chain[1]['timestamp'] = chain[0]['timestamp'] - 1
+    restored = Block.from_dict(chain[1])
+    chain[1]['hash'] = bc.proof_of_work(restored)
+    chain[1]['nonce'] = restored.nonce
+    try:
+        Blockchain().load_from_dict({'chain': chain}, validate=True)
+        assert False, "Chain with a backwards timestamp loaded"
+    except ValueError as e:
+        assert "timestamp" in str(e), f"Unexpected error: {e}"
+    print("[PASS] Chain validation rejects backwards timestamps")
+
+    print("[SUCCESS] All difficulty retarget tests passed!\n")
+
+def test_block_template():
+    """Test that the block template follows pending transactions and the tip"""
+    print("Testing block template...")
+
+    from app.models.transaction import transaction_id
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    txs = [{"sender_address": "FAUCET", "sender_pubkey": None, "receiver_address": f"addr{i}",
+            "amount": i, "signature": None} for i in range(4)]
+    for tx in txs[:3]:
+        bc.add_new_transaction(tx)
+    template = bc.block_template()
+    assert template.index == 1 and template.previous_hash == bc.last_block.hash, "Template is not on the tip"
+    assert template.leaves == [bytes.fromhex(transaction_id(tx)) for tx in txs[:3]], "Template leaves differ from txids"
+    print("[PASS] Template follows accepted transactions")
+
+    # Re-adding a pending transaction is rejected and leaves the template alone
+    leaves = list(template.leaves)
+    assert not bc.add_new_transaction(dict(txs[0])), "Duplicate transaction was accepted"
+    assert all(a is b for a, b in zip(bc.block_template().leaves, leaves)), "Known transactions were re-hashed"
+    print("[PASS] Known transaction ids are reused")
+
+    block = template.build({"sender_address": "COINBASE", "sender_pubkey": None,
+                            "receiver_address": "MINER", "amount": 50, "signature": None})
+    fresh = Block.from_dict(block.to_dict())
+    assert block.merkle_root == fresh.merkle_root and block.compute_hash() == fresh.compute_hash(), \
+        "Template block differs from the same block rebuilt from scratch"
+    print("[PASS] Template block hashes like a fresh block")
+
+    bc.mine(miner_address="MINER")
+    bc.add_new_transaction(txs[3])
+    template = bc.block_template()
+    assert template.index == 2 and template.previous_hash == bc.last_block.hash, "Template did not move to the new tip"
+    assert template.transactions == [txs[3]], "Template should only hold the new transaction"
+    print("[PASS] Template moves to the new tip")
+
+    print("[SUCCESS] All block template tests passed!\n")
+
+def test_mempool():
+    """Test the mempool indexes, pending balances and removal on block arrival"""
+    print("Testing mempool...")
+
+    from app.models.transaction import transaction_id
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    faucet = {"sender_address": "FAUCET", "sender_pubkey": None, "receiver_address": "alice",
+              "amount": 10, "signature": None}
+    send = {"sender_address": "alice", "sender_pubkey": None, "receiver_address": "bob",
+            "amount": 3, "signature": None}
+    bc.mempool.add(faucet)
+    bc.mempool.add(send)
+    assert transaction_id(send) in bc.mempool, "Transaction not indexed by id"
+    assert bc.mempool.for_address("alice") == [faucet, send], "Address index lost a transaction"
+    assert bc.mempool.pending_delta("alice") == 7 and bc.mempool.pending_delta("bob") == 3, \
+        "Wrong pending balances"
+    print("[PASS] Transactions indexed by id and address")
+
+    # A block confirming only the faucet transaction leaves the transfer pending
+    block = bc.block_template().build()
+    bc.mempool.add({"sender_address": "FAUCET", "sender_pubkey": None, "receiver_address": "carol",
+                    "amount": 1, "signature": None})
+    block.transactions = block.transactions[:1]
+    proof = bc.proof_of_work(block)
+    assert bc.add_block(block, proof), "Block was rejected"
+    assert bc.unconfirmed_transactions[0] == send and len(bc.mempool) == 2, \
+        "Block arrival should only remove its own transactions"
+    assert bc.mempool.pending_delta("alice") == -3, "Pending balance not updated on removal"
+    assert bc.block_template().transactions == bc.unconfirmed_transactions, "Template out of sync with mempool"
+    print("[PASS] Block arrival removes only confirmed transactions")
+
+    print("[SUCCESS] All mempool tests passed!\n")
+
+def test_block_and_mempool_limits():
+    """Test that blocks take a bounded prefix of the mempool and a full mempool rejects"""
+    print("Testing block and mempool limits...")
+
+    from app.models.mempool import MempoolFull, transaction_size
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    bc.TEMPLATE_MAX_TRANSACTIONS = 3
+    txs = [{"sender_address": "FAUCET", "sender_pubkey": None, "receiver_address": f"addr{i}",
+            "amount": 1, "signature": None} for i in range(5)]
+    for tx in txs:
+        assert bc.add_new_transaction(tx), "Transaction rejected"
+    bc.mine(miner_address="MINER")
+    assert bc.last_block.transactions[1:] == txs[:3], "Block should hold the three oldest transactions"
+    assert bc.unconfirmed_transactions == txs[3:], "Transactions beyond the limit should stay pending"
+    print("[PASS] Block takes the oldest transactions up to the count limit")
+
+    bc.TEMPLATE_MAX_BYTES = transaction_size(txs[3])  # Room for one transaction
+    bc.mine(miner_address="MINER")
+    assert bc.last_block.transactions[1:] == [txs[3]], "Byte limit not applied"
+    print("[PASS] Block respects the byte limit")
+
+    oversized = dict(txs[0], receiver_address="x" * bc.TEMPLATE_MAX_BYTES)
+    assert not bc.add_new_transaction(oversized), "Transaction larger than a block accepted"
+    print("[PASS] Transactions that can never be mined are rejected")
+
+    bc.mempool.max_transactions = 2
+    extra = [dict(tx, amount=2) for tx in txs[:2]]
+    assert bc.add_new_transaction(extra[0]), "Transaction rejected below the limit"
+    try:
+        bc.add_new_transaction(extra[1])
+        assert False, "Full mempool accepted a transaction"
+    except MempoolFull:
+        pass
+    assert len(bc.mempool) == 2 and extra[1] not in bc.unconfirmed_transactions, "Full mempool changed"
+    bc.mempool.max_transactions = None
+    assert bc.add_new_transaction(extra[1]), "Rejected transaction could not be sent again"
+    print("[PASS] Full mempool rejects new transactions")
+
+    # Local limits only shape the blocks mined here; peers may fill blocks
+    # up to the consensus limits
+    peer_block = bc.block_template().build()
+    peer_block.transactions = peer_block.transactions + [dict(tx, amount=4) for tx in txs[:3]]
+    assert bc.add_block(peer_block, bc.proof_of_work(peer_block)), "Block within the consensus limits rejected"
+    print("[PASS] Blocks over the local limits but within consensus are accepted")
+
+    bc.MAX_BLOCK_TRANSACTIONS = 3
+    big_block = bc.block_template().build()
+    big_block.transactions = big_block.transactions + [dict(tx, amount=3) for tx in txs[:4]]
+    assert not bc.add_block(big_block, bc.proof_of_work(big_block)), "Oversized block accepted"
+    print("[PASS] Blocks over the limits are rejected")
+
+    # The block accepted above is now oversized; validation applies the same rule
+    errors = bc.validate_chain(full=True)['errors']
+    assert any("size limits" in error for error in errors), f"Oversized block validated: {errors}"
+    strict = Blockchain()
+    strict.BASE_DIFFICULTY = 1
+    strict.MAX_BLOCK_TRANSACTIONS = 3
+    try:
+        strict.load_from_dict(bc.to_dict(), validate=True)
+        assert False, "Chain with an oversized block loaded"
+    except ValueError as e:
+        assert "size limits" in str(e), f"Unexpected error: {e}"
+    print("[PASS] Chain validation enforces the block limits")
+
+    from app.models.block_template import coinbase_transaction
+    stuffed = bc.block_template().build(coinbase_transaction("MINER", 50))
+    filler = "x" * bc.MAX_BLOCK_BYTES  # Coinbase entries do not go through the mempool
+    stuffed.transactions = stuffed.transactions + [coinbase_transaction(filler, 50)]
+    assert not bc.add_block(stuffed, bc.proof_of_work(stuffed)), "Extra coinbase entries escaped the limits"
+    print("[PASS] Only the first coinbase is exempt from the limits")
+
+    print("[SUCCESS] All block and mempool limit tests passed!\n")
+
+def test_balance_index():
+    """Test that the balance index matches a scan of every block"""
+    print("Testing balance index...")
+
+    def scan(chain, address):
+        balance = 0
+        for block in chain:
+            for tx in block.transactions:
+                if isinstance(tx, dict):
+                    if tx.get("receiver_address") == address:
+                        balance += tx.get("amount", 0)
+                    if tx.get("sender_address") == address:
+                        balance -= tx.get("amount", 0)
+        return balance
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    payments = [("FAUCET", "alice", 100), ("alice", "bob", 0.1), ("alice", "bob", 0.2),
+                ("bob", "bob", 5), ("bob", "carol", 0.3)]
+    for i, (sender, receiver, amount) in enumerate(payments):
+        bc.mempool.add({"sender_address": sender, "sender_pubkey": None, "receiver_address": receiver,
+                        "amount": amount, "signature": None, "nonce": i})
+        bc.mine(miner_address="MINER")
+    addresses = ["alice", "bob", "carol", "MINER", "FAUCET", "nobody"]
+    for address in addresses:
+        assert bc.balances.balance(address) == scan(bc.chain, address), f"Index differs from scan for {address}"
+    print("[PASS] Index updated by add_block matches the scan")
+
+    loaded = Blockchain()
+    loaded.load_from_dict(bc.to_dict())
+    assert loaded.confirmed_balances(addresses) == {a: scan(bc.chain, a) for a in addresses}, \
+        "Index rebuilt by load_from_dict differs from the scan"
+    print("[PASS] Index rebuilt when the chain is replaced")
+
+    print("[SUCCESS] All balance index tests passed!\n")
+
+def test_transaction_history():
+    """Test the address history index and its newest-first pages"""
+    print("Testing transaction history index...")
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    for i in range(3):
+        for receiver in ("alice", "bob"):
+            bc.mempool.add({"sender_address": "FAUCET", "sender_pubkey": None, "receiver_address": receiver,
+                            "amount": 1, "signature": None, "nonce": i})
+        bc.mine(miner_address="MINER")
+    bc.mempool.add({"sender_address": "alice", "sender_pubkey": None, "receiver_address": "alice",
+                    "amount": 1, "signature": None})
+    bc.mine()
+
+    def locations(history, address, limit, before=None):
+        entries, _ = history.page_blocks(address, limit, before)
+        return [location for location, _ in entries]
+
+    expected = [(4, 0), (3, 1), (2, 1), (1, 1)]
+    assert bc.history.count("alice") == 4, "Self-payment should be listed once"
+    first, total = bc.history.page_blocks("alice", 3)
+    assert [location for location, _ in first] == expected[:3] and total == 4, f"Unexpected first page: {first}"
+    assert locations(bc.history, "alice", 3, before=first[-1][0]) == expected[3:], "Cursor page mismatch"
+    for (height, position), block in first:
+        tx = block.transactions[position]
+        assert block is bc.chain[height], "Page paired with another block"
+        assert "alice" in (tx["sender_address"], tx["receiver_address"]), "Location points at another transaction"
+    print("[PASS] Pages are newest first and follow the cursor")
+
+    loaded = Blockchain()
+    loaded.load_from_dict(bc.to_dict())
+    assert locations(loaded.history, "MINER", 10) == locations(bc.history, "MINER", 10) == [(3, 0), (2, 0), (1, 0)], \
+        "Index rebuilt by load_from_dict differs"
+    print("[PASS] Index rebuilt when the chain is replaced")
+
+    # A sync swaps the chain before re-indexing it; pages read meanwhile
+    # still take their blocks from the indexed chain
+    old_block = bc.chain[4]
+    bc._chain = Blockchain().chain
+    (location, block), = bc.history.page_blocks("alice", 1)[0]
+    assert location == (4, 0) and block is old_block, "Block read from another chain"
+    bc.history.rebuild(bc.chain)
+    assert bc.history.page_blocks("alice", 1) == ([], 0), "Locations of the old chain kept"
+    print("[PASS] Pages and their blocks come from the same chain")
+
+    print("[SUCCESS] All transaction history tests passed!\n")
+
+def test_gossip_dedup():
+    """Test that transactions already seen are dropped before verification"""
+    print("Testing gossip deduplication...")
+
+    from app.models.key_cache import verified_signatures
+    from app.models.transaction import Transaction
+    from app.models.util import b64encode
+    from app.models.wallet import Wallet
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    wallet = Wallet()
+    tx = Transaction(wallet.get_address, b64encode(wallet.public_key.to_string()), "receiver", 5)
+    tx.sign(wallet)
+    assert bc.add_new_transaction(tx.to_dict()), "Signed transaction rejected"
+
+    verified_signatures.clear()
+    assert not bc.add_new_transaction(tx.to_dict()), "Echoed transaction accepted twice"
+    assert verified_signatures.hits + verified_signatures.misses == 0, "Echo reached signature verification"
+    assert len(bc.mempool) == 1 and bc.seen_transactions.duplicates == 1, "Echo changed the mempool"
+    print("[PASS] Echoed transaction dropped before verification")
+
+    relayed = dict(tx.to_dict(), relay=1)  # Not covered by the signature
+    assert not bc.add_new_transaction(relayed), "Copy with an extra key accepted"
+    assert len(bc.mempool) == 1 and bc.mempool.pending_delta(wallet.get_address) == -5, "Payment counted twice"
+    print("[PASS] Extra keys do not give a signed transaction another id")
+
+    duplicates = bc.seen_transactions.duplicates
+    bc.mine(miner_address="MINER")
+    assert bc.seen_transactions.duplicates == duplicates, "Mined transactions counted as duplicates"
+    assert not bc.add_new_transaction(tx.to_dict()) and len(bc.mempool) == 0, \
+        "Confirmed transaction re-entered the mempool"
+    print("[PASS] Late copies of confirmed transactions are dropped")
+
+    bc.seen_transactions.max_entries = 2
+    for i in range(3):
+        bc.seen_transactions.add(f"id{i}")
+    assert len(bc.seen_transactions) == 2 and "id0" not in bc.seen_transactions, "Seen set is not bounded"
+    print("[PASS] Seen set forgets the oldest ids")
+
+    print("[SUCCESS] All gossip deduplication tests passed!\n")
+
+def test_validation_checkpoint():
+    """Test that validation resumes above the validated-height checkpoint"""
+    print("Testing validation checkpoint...")
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    for _ in range(3):
+        bc.mine(miner_address="MINER")
+    result = bc.validate_chain()
+    assert result['valid'] and result['checked_blocks'] == 4, f"First validation should check every block: {result}"
+    assert bc.checkpoint == {"height": 3, "hash": bc.last_block.hash}, f"Unexpected checkpoint: {bc.checkpoint}"
+
+    bc.mine(miner_address="MINER")
+    result = bc.validate_chain()
+    assert result['valid'] and result['checked_blocks'] == 1, f"Only the new block should be checked: {result}"
+    print("[PASS] Only blocks above the checkpoint are checked")
+
+    bc.chain[2].nonce += 1  # Below the checkpoint: only a full validation sees it
+    assert bc.validate_chain()['valid'], "Incremental validation re-checked old blocks"
+    assert not bc.validate_chain(full=True)['valid'], "Full validation missed a tampered block"
+    assert bc.checkpoint is None, "Failed full validation must clear the checkpoint"
+    bc.chain[2].nonce -= 1
+    print("[PASS] Full validation re-checks every block")
+
+    bc.validate_chain()
+    saved = bc.checkpoint
+    bc.load_from_dict(bc.to_dict())
+    assert bc.checkpoint is None, "Replacing the chain must clear the checkpoint"
+    assert bc.restore_checkpoint(saved), "Saved checkpoint should match the reloaded chain"
+    assert not bc.restore_checkpoint({"height": 2, "hash": "00" * 32}), "Checkpoint with a wrong hash restored"
+    assert bc.validate_chain()['checked_blocks'] == 0, "Restored checkpoint was not used"
+    print("[PASS] Checkpoint cleared on chain replacement and restored when matching")
+
+    print("[SUCCESS] All validation checkpoint tests passed!\n")
+
+def test_parallel_validation():
+    """Test that sharded validation reports the same errors as serial validation"""
+    print("Testing parallel validation...")
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    bc.RETARGET_WINDOW = 3
+    bc.PARALLEL_VALIDATION_MIN_BLOCKS = 4
+    for _ in range(12):
+        bc.mine(miner_address="MINER")
+    assert bc.chain_errors(bc.chain, 0, workers=3) == [], "Valid chain rejected by parallel validation"
+    print("[PASS] Valid chain accepted by 3 workers")
+
+    # Errors on shard boundaries and inside shards
+    bc.chain[4].nonce += 1
+    bc.chain[9].previous_hash = "00" * 32
+    bc.chain[12].bits += 1
+    serial = bc.chain_errors(bc.chain, 0, workers=1)
+    parallel = bc.chain_errors(bc.chain, 0, workers=3)
+    assert len(serial) >= 3, f"Expected at least 3 errors, got {serial}"
+    assert parallel == serial, f"Parallel errors differ:\n{parallel}\n{serial}"
+    print(f"[PASS] {len(parallel)} errors reported in block order")
+
+    data = bc.to_dict()
+    try:
+        Blockchain().load_from_dict(data, validate=True, workers=2)
+        assert False, "Invalid chain was loaded"
+    except ValueError:
+        pass
+    print("[PASS] Invalid chain refused by load_from_dict")
+
+    print("[SUCCESS] All parallel validation tests passed!\n")
+
+def test_validation_stream():
+    """Test streamed validation progress and early exit"""
+    print("Testing validation stream...")
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    for _ in range(5):
+        bc.mine(miner_address="MINER")
+    records = list(bc.validate_chain_stream(batch_size=2))
+    assert [r["checked"] for r in records] == [2, 4, 6, 6], f"Unexpected progress: {records}"
+    assert records[-1]["type"] == "result" and records[-1]["valid"], "Valid chain reported invalid"
+    assert bc.checkpoint["height"] == 5, "Complete pass should move the checkpoint"
+    print("[PASS] Progress reported after every batch")
+
+    bc.chain[1].nonce += 1
+    bc.chain[4].nonce += 1
+    result = list(bc.validate_chain_stream(full=True, max_errors=1, batch_size=2))[-1]
+    assert len(result["errors"]) == 1 and result["stopped_early"], f"Should stop at the first error: {result}"
+    assert result["checked"] == 2, f"Blocks after the first error batch were checked: {result}"
+    assert bc.checkpoint is not None, "Stopped pass must not touch the checkpoint"
+    result = list(bc.validate_chain_stream(full=True, batch_size=2))[-1]
+    assert len(result["errors"]) == 2 and not result["stopped_early"], f"Expected 2 errors: {result}"
+    assert result["errors"] == bc.validate_chain(full=True)["errors"], "Stream and validate_chain disagree"
+    assert not result["errors_truncated"], "Uncapped errors reported as truncated"
+    result = list(bc.validate_chain_stream(full=True, max_errors=1, batch_size=10))[-1]
+    assert len(result["errors"]) == 1 and not result["stopped_early"], f"Single batch should complete: {result}"
+    assert result["errors_truncated"], "Errors dropped in the final batch not reported"
+    print("[PASS] Validation stops after max_errors")
+
+    print("[SUCCESS] All validation stream tests passed!\n")
+
+def test_parallel_mining():
+    """Test that blocks mined by a process pool are valid proofs"""
+    print("Testing parallel mining...")
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 2
+    result = bc.mine(miner_address="MINER", workers=3)
+    block = bc.last_block
+    assert result['index'] == 1, f"Unexpected block index: {result['index']}"
+    assert Blockchain.is_valid_proof(block, block.hash), "Mined block is not a valid proof"
+    assert len(result['workers']) == 3, f"Expected 3 worker reports, got {len(result['workers'])}"
+    assert sum(w['hashes'] for w in result['workers']) > 0, "Workers reported no hashes"
+    print(f"[PASS] Block mined by 3 workers at {result['hashrate']} H/s")
+
+    assert bc.validate_chain()['valid'], "Chain with parallel-mined block is invalid"
+    print("[PASS] Chain validates")
+
+    # A worker that dies without reporting must not discard the block found
+    from app.models import miner
+    real_worker = miner._mine_worker
+    miner._mine_worker = _dying_mine_worker
+    try:
+        result = bc.mine(miner_address="MINER", workers=3)
+    finally:
+        miner._mine_worker = real_worker
+    assert result['index'] == 2 and Blockchain.is_valid_proof(bc.last_block, bc.last_block.hash), \
+        "Block found before a worker died was not kept"
+    assert [w['worker'] for w in result['workers']] == [0], f"Unexpected reports: {result['workers']}"
+    print("[PASS] Found block kept when a worker dies")
+
+    print("[SUCCESS] All parallel mining tests passed!\n")
+
+from app.models.miner import _mine_worker as _real_mine_worker
+
+def _dying_mine_worker(worker_id, *args):
+    """Mining worker of which every process but the first exits without reporting"""
+    if worker_id != 0:
+        os._exit(1)
+    _real_mine_worker(worker_id, *args)
+
+def test_mining_cancelled_on_tip_change():
+    """Test that mining stops when the chain tip is replaced"""
+    print("Testing mining cancellation...")
+
+    import threading
+    import time
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 8  # Far too hard to finish during the test
+    outcome = {}
+
+    def run():
+        try:
+            bc.mine(miner_address="MINER")
+        except MiningCancelled as e:
+            outcome['reason'] = str(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    time.sleep(0.2)
+    bc.load_from_dict(bc.to_dict())  # Same chain, new tip object (e.g. sync)
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "Mining did not stop after the tip changed"
+    assert outcome.get('reason') == "chain tip changed", f"Unexpected outcome: {outcome}"
+    assert len(bc.chain) == 1, "Cancelled mining must not add a block"
+    print("[PASS] Mining cancelled when the tip changed")
+
+    try:
+        bc.mine(miner_address="MINER", should_stop=lambda: "stop requested")
+        assert False, "Mining should have been cancelled"
+    except MiningCancelled as e:
+        assert str(e) == "stop requested", f"Unexpected reason: {e}"
+    print("[PASS] should_stop callback cancels mining")
+
+    print("[SUCCESS] All mining cancellation tests passed!\n")
+
+def test_concurrent_add_block():
+    """Test that blocks added from two threads cannot both extend the same tip"""
+    print("Testing concurrent block addition...")
+
+    import threading
+    import time
+    from app.models.block_template import coinbase_transaction
+
+    bc = Blockchain()
+    bc.BASE_DIFFICULTY = 1
+    blocks = []
+    for miner in ("alice", "bob"):
+        block = bc.block_template().build(coinbase_transaction(miner, 50))
+        blocks.append((block, bc.proof_of_work(block)))
+
+    # Widen the window between the tip check and the append
+    within_block_limits = bc.within_block_limits
+    def slow_limits(block):
+        time.sleep(0.05)
+        return within_block_limits(block)
+    bc.within_block_limits = slow_limits
+
+    results = []
+    threads = [threading.Thread(target=lambda b=b, p=p: results.append(bc.add_block(b, p))) for b, p in blocks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results) == [False, True], f"Unexpected results: {results}"
+    assert len(bc.chain) == 2 and bc.validate_chain(full=True)['valid'], "Both blocks extended the same tip"
+    assert bc.balances.balance("alice") + bc.balances.balance("bob") == 50, "Indexes hold both blocks"
+    print("[PASS] Only one of two competing blocks is added")
+
+    print("[SUCCESS] All concurrent block addition tests passed!\n")
+
+if __name__ == "__main__":
+    try:
+        test_block_header_versions()
+        test_merkle_proofs()
+        test_duplicate_transactions_rejected()
+        test_difficulty_retarget()
+        test_block_template()
+        test_mempool()
+        test_block_and_mempool_limits()
+        test_balance_index()
+        test_transaction_history()
+        test_gossip_dedup()
+        test_validation_checkpoint()
+        test_parallel_validation()
+        test_validation_stream()
+        test_parallel_mining()
+        test_mining_cancelled_on_tip_change()
+        test_concurrent_add_block()
+        print("=" * 50)
+        print("ALL TESTS PASSED SUCCESSFULLY!")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n[FAIL] TEST FAILED: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[ERROR] {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -1,10 +1,13 @@
 """
 Test script to verify custom hash implementations against known test vectors
 """
+import os
 import sys
-sys.path.insert(0, 'c:\\Proyectos\\Mini-Blockchain')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app.models.hash_functions import sha256, ripemd160
+from app.models.hash_functions import (
+    sha256, ripemd160, sha256_midstate, sha256_from_midstate, sha256_batch, SHA256, RIPEMD160
+)
 
 def test_sha256():
     """Test SHA-256 against known test vectors from NIST"""
@@ -36,6 +39,46 @@ def test_sha256():
     
     print("[SUCCESS] All SHA-256 tests passed!\n")
 
+def test_sha256_midstate():
+    """Test that hashing from a cached prefix state matches a full hash"""
+    print("Testing SHA-256 midstate...")
+    
+    message = bytes(range(256)) * 3
+    for split in (0, 1, 55, 63, 64, 65, 128, 300, len(message)):
+        midstate = sha256_midstate(message[:split])
+        result = sha256_from_midstate(midstate, message[split:])
+        assert result == sha256(message), f"Midstate split at {split} failed: {result.hex()}"
+    print("[PASS] Midstate matches full hash at every split point")
+    
+    print("[SUCCESS] All SHA-256 midstate tests passed!\n")
+
+def test_sha256_batch():
+    """Test the batch engine against the NIST vectors and the scalar sha256"""
+    print("Testing SHA-256 batch engine...")
+    
+    vectors = {
+        b"": "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855",
+        b"abc": "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad",
+        b"abcdbcdecdefdefgefghfghighijhijkijkljklmklmnlmnomnopnopq": "248d6a61d20638b8e5c026930c3e6039a33ce45964ff2167f6ecedd419db06c1",
+        b"The quick brown fox jumps over the lazy dog": "d7a8fbb307d7809469ca9abcb0082e4f8d5651e46d3cdb762d02d0bf37c9e592",
+    }
+    # Repeat the vectors so every chunk-count group is large enough to vectorize
+    messages = list(vectors) * 16
+    results = sha256_batch(messages)
+    for message, result in zip(messages, results):
+        assert result.hex() == vectors[message], f"Batch {message!r} failed: {result.hex()}"
+    print("[PASS] Test vectors match")
+    
+    # A nonce range sharing a cached prefix, like the miner uses
+    prefix = b'{"index": 1, "nonce": ' + b"x" * 100
+    tails = [str(n).encode() + b', "timestamp": 0}' for n in range(990, 1030)]
+    results = sha256_batch(tails, sha256_midstate(prefix))
+    for tail, result in zip(tails, results):
+        assert result == sha256(prefix + tail), f"Batch with midstate failed for {tail!r}"
+    print("[PASS] Nonce range with midstate matches scalar sha256")
+    
+    print("[SUCCESS] All SHA-256 batch tests passed!\n")
+
 def test_ripemd160():
     """Test RIPEMD-160 against known test vectors"""
     print("Testing RIPEMD-160 implementation...")
@@ -66,6 +109,100 @@ def test_ripemd160():
     
     print("[SUCCESS] All RIPEMD-160 tests passed!\n")
 
+def test_unrolled_hash_functions():
+    """Test the code-generated compression functions against the same vectors"""
+    print("Testing unrolled hash functions...")
+    
+    from app.models import hash_unrolled
+    
+    vectors = [
+        (hash_unrolled.sha256, b"", "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"),
+        (hash_unrolled.sha256, b"abc", "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"),
+        (hash_unrolled.sha256, b"abcdbcdecdefdefgefghfghighijhijkijkljklmklmnlmnomnopnopq", "248d6a61d20638b8e5c026930c3e6039a33ce45964ff2167f6ecedd419db06c1"),
+        (hash_unrolled.sha256, b"The quick brown fox jumps over the lazy dog", "d7a8fbb307d7809469ca9abcb0082e4f8d5651e46d3cdb762d02d0bf37c9e592"),
+        (hash_unrolled.ripemd160, b"", "9c1185a5c5e9fc54612808977ee8f548b2258d31"),
+        (hash_unrolled.ripemd160, b"abc", "8eb208f7e05d987a9b044a8e98c6b087f15a0bfc"),
+        (hash_unrolled.ripemd160, b"message digest", "5d0689ef49d2fae572b881b123a85ffa21595f36"),
+        (hash_unrolled.ripemd160, b"abcdefghijklmnopqrstuvwxyz", "f71c27109c692c1b56bbdceb5b9d2865b3708dbc"),
+    ]
+    for func, message, expected in vectors:
+        result = func(message)
+        assert result.hex() == expected, f"Unrolled {func.__name__} {message!r} failed: {result.hex()}"
+    print("[PASS] Test vectors match")
+    
+    # Every padding boundary must agree with the reference implementation
+    message = bytes(range(256))
+    for length in range(0, 200):
+        assert hash_unrolled.sha256(message[:length]) == sha256(message[:length]), f"sha256 length {length} failed"
+        assert hash_unrolled.ripemd160(message[:length]) == ripemd160(message[:length]), f"ripemd160 length {length} failed"
+    print("[PASS] Unrolled output matches reference for lengths 0-199")
+    
+    print("[SUCCESS] All unrolled hash tests passed!\n")
+
+def test_streaming_hashers():
+    """Test incremental update/copy/digest against the one-shot functions"""
+    print("Testing streaming hashers...")
+    
+    message = bytes(range(256)) * 4
+    for cls, one_shot in ((SHA256, sha256), (RIPEMD160, ripemd160)):
+        # Feed the message in uneven pieces, including memoryview slices
+        view = memoryview(message)
+        for step in (1, 7, 63, 64, 65, 500):
+            h = cls()
+            for start in range(0, len(message), step):
+                h.update(view[start:start + step])
+            assert h.digest() == one_shot(message), f"{cls.name} failed with step {step}"
+            assert h.hexdigest() == one_shot(message).hex(), f"{cls.name} hexdigest failed"
+        print(f"[PASS] {cls.name} chunked updates match one-shot hash")
+        
+        # digest() does not finalize, and copies are independent
+        h = cls(message[:100])
+        clone = h.copy()
+        h.digest()
+        h.update(message[100:])
+        clone.update(b"other tail")
+        assert h.digest() == one_shot(message), f"{cls.name} digest() changed the state"
+        assert clone.digest() == one_shot(message[:100] + b"other tail"), f"{cls.name} copy() shares state"
+        print(f"[PASS] {cls.name} copy() clones the state")
+    
+    print("[SUCCESS] All streaming hasher tests passed!\n")
+
+def test_hash_backends():
+    """Test that every backend agrees with the reference and cross-check counts"""
+    print("Testing hash backends...")
+    
+    from app.models import hash_backends
+    
+    messages = [b"", b"abc", b"message digest", bytes(range(256)) * 5]
+    try:
+        for name in hash_backends.available_backends():
+            hash_backends.set_backend(name, cross_check_rate=1.0)
+            for message in messages:
+                assert hash_backends.sha256(message) == sha256(message), f"{name} sha256 failed"
+                assert hash_backends.ripemd160(message) == ripemd160(message), f"{name} ripemd160 failed"
+            midstate = hash_backends.sha256_midstate(b"prefix" * 20)
+            batch = hash_backends.sha256_batch(messages, midstate)
+            assert batch == [sha256(b"prefix" * 20 + m) for m in messages], f"{name} sha256_batch failed"
+            stats = hash_backends.get_stats()
+            assert stats["mismatches"] == 0, f"{name} cross-check reported mismatches"
+            print(f"[PASS] Backend '{name}' matches reference ({stats['checked']} cross-checked)")
+        
+        # A broken backend must be caught by the cross-check
+        broken = hash_backends.HashBackend(
+            "broken", sha256=lambda data: bytes(32), ripemd160=ripemd160,
+            sha256_midstate=None, sha256_batch=None
+        )
+        hash_backends.register_backend(broken)
+        hash_backends.set_backend("broken", cross_check_rate=1.0)
+        hash_backends.sha256(b"abc")
+        assert hash_backends.get_stats()["mismatches"] == 1, "Cross-check missed a wrong digest"
+        print("[PASS] Cross-check reports mismatches")
+    finally:
+        hash_backends._backends.pop("broken", None)
+        hash_backends.set_backend("reference")
+    
+    print("[SUCCESS] All hash backend tests passed!\n")
+
 def test_blockchain_integration():
     """Test that the blockchain components work with custom hash functions"""
     print("Testing blockchain integration...")
@@ -106,12 +243,25 @@ def test_blockchain_integration():
     assert len(block_hash) == 64, f"Block hash should be 64 hex chars, got {len(block_hash)}"
     print(f"[PASS] Block hash computed: {block_hash[:16]}...")
     
+    # Test that the midstate miner produces the same hash as compute_hash
+    from app.models.blockchain import Blockchain
+    block = Block(1, [tx.to_dict()] * 5, "0" * 64, difficulty=1)
+    proof = Blockchain().proof_of_work(block)
+    assert proof == block.compute_hash(), "Mined hash differs from compute_hash"
+    assert Blockchain.is_valid_proof(block, proof), "Mined block is not a valid proof"
+    print(f"[PASS] Block mined with nonce {block.nonce}: {proof[:16]}...")
+    
     print("[SUCCESS] All blockchain integration tests passed!\n")
 
 if __name__ == "__main__":
     try:
         test_sha256()
+        test_sha256_midstate()
+        test_sha256_batch()
         test_ripemd160()
+        test_unrolled_hash_functions()
+        test_streaming_hashers()
+        test_hash_backends()
         test_blockchain_integration()
         print("=" * 50)
         print("ALL TESTS PASSED SUCCESSFULLY!")
@@ -0,0 +1,175 @@
+"""
+Test script to verify wallet keypairs, the key and signature caches and transaction signature checks
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.hash_functions import sha256, ripemd160
+
+def test_public_key_cache():
+    """Test that the shared key cache derives the same address and counts hits"""
+    print("Testing public key cache...")
+    
+    from app.models.key_cache import PublicKeyCache
+    from app.models.wallet import Wallet
+    
+    cache = PublicKeyCache(max_entries=2)
+    wallets = [Wallet() for _ in range(3)]
+    pubkey = wallets[0].public_key.to_string()
+    expected = ripemd160(sha256(pubkey)).hex()
+    
+    address, verifying_key = cache.lookup(pubkey)
+    assert address == expected, f"Cached address mismatch: {address}"
+    assert verifying_key.to_string() == pubkey, "Cached verifying key mismatch"
+    assert cache.lookup(pubkey)[1] is verifying_key, "Second lookup did not hit the cache"
+    assert (cache.hits, cache.misses) == (1, 1), f"Unexpected counters: {cache.stats()}"
+    print("[PASS] Address derived once and reused")
+    
+    # Least recently used key is evicted beyond max_entries
+    cache.lookup(wallets[1].public_key.to_string())
+    cache.lookup(wallets[2].public_key.to_string())
+    assert cache.stats()["entries"] == 2, "Cache grew beyond max_entries"
+    cache.lookup(pubkey)
+    assert cache.misses == 4, "Evicted key should miss"
+    print("[PASS] LRU eviction keeps the cache bounded")
+    
+    # Hot keys get a precomputed table that verifies the same signatures
+    import ecdsa
+    from app.models.key_cache import KEY_ENTRY_BYTES, PRECOMPUTED_TABLE_BYTES
+    cache = PublicKeyCache(precompute_after=3)
+    message = b"\x01" * 32
+    signature = wallets[0].private_key.sign(message)
+    for _ in range(3):
+        verifying_key = cache.verifying_key(pubkey)
+    assert cache.precomputed == 1, f"Hot key was not precomputed: {cache.stats()}"
+    assert verifying_key.to_string() == pubkey and verifying_key.verify(signature, message), \
+        "Precomputed key does not verify"
+    try:
+        verifying_key.verify(signature, b"\x02" * 32)
+        assert False, "Precomputed key accepted a wrong message"
+    except ecdsa.BadSignatureError:
+        pass
+    print("[PASS] Hot keys are precomputed")
+    
+    # The memory budget evicts cold keys, tables included
+    cache = PublicKeyCache(memory_budget=PRECOMPUTED_TABLE_BYTES + 2 * KEY_ENTRY_BYTES, precompute_after=2)
+    cache.lookup(pubkey)
+    cache.lookup(pubkey)
+    cache.lookup(wallets[1].public_key.to_string())
+    cache.lookup(wallets[2].public_key.to_string())
+    assert cache.memory <= cache.memory_budget, f"Cache exceeds its memory budget: {cache.stats()}"
+    assert cache.stats()["entries"] == 2 and cache.precomputed == 0, "Least recently used key was not evicted"
+    print("[PASS] Memory budget keeps the cache bounded")
+    
+    print("[SUCCESS] All public key cache tests passed!\n")
+
+def test_key_pool():
+    """Test that the keypair pool refills in the background and falls back inline"""
+    print("Testing keypair pool...")
+    
+    import time
+    from app.services.wallet_pool import KeyPool
+    
+    pool = KeyPool(depth=3)
+    keypairs = pool.take(2)  # Not started: generated inline
+    assert len(keypairs) == 2 and pool.generated_inline == 2, f"Unexpected stats: {pool.stats()}"
+    for wallet, address in keypairs:
+        pubkey = wallet.public_key.to_string()
+        assert address == ripemd160(sha256(pubkey)).hex(), "Pool address does not match the key"
+    print("[PASS] Keypairs generated inline without the thread")
+    
+    pool.start()
+    deadline = time.time() + 10
+    while pool.stats()["ready"] < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    assert pool.stats()["ready"] == 3, f"Pool was not filled: {pool.stats()}"
+    keypairs = pool.take(5)
+    assert pool.from_pool == 3 and pool.generated_inline == 4, f"Unexpected stats: {pool.stats()}"
+    assert len({address for _, address in keypairs}) == 5, "Duplicate keypairs handed out"
+    print("[PASS] Pool filled in the background and drained first")
+    
+    print("[SUCCESS] All keypair pool tests passed!\n")
+
+def test_signature_cache():
+    """Test that successful signature checks are cached and failures are not"""
+    print("Testing signature cache...")
+    
+    from app.models.key_cache import verified_signatures
+    from app.models.transaction import Transaction
+    from app.models.util import b64encode
+    from app.models.wallet import Wallet
+    
+    verified_signatures.clear()
+    wallet = Wallet()
+    tx = Transaction(wallet.get_address, b64encode(wallet.public_key.to_string()), "receiver", 5)
+    tx.sign(wallet)
+    
+    assert tx.verify_signature(), "Valid signature rejected"
+    assert Transaction.from_dict(tx.to_dict()).verify_signature(), "Valid signature rejected on second check"
+    assert verified_signatures.hits == 1 and verified_signatures.stats()["entries"] == 1, \
+        f"Second check should hit the cache: {verified_signatures.stats()}"
+    print("[PASS] Signature verified once and reused")
+    
+    tampered = Transaction.from_dict(dict(tx.to_dict(), amount=500))
+    assert not tampered.verify_signature(), "Tampered transaction accepted"
+    assert not tampered.verify_signature(), "Tampered transaction accepted on second check"
+    assert verified_signatures.stats()["entries"] == 1, "Failed verification was cached"
+    print("[PASS] Failed verifications are not cached")
+    
+    print("[SUCCESS] All signature cache tests passed!\n")
+
+def test_bulk_signature_verification():
+    """Test that verify_signatures matches verify_signature, in-process and in parallel"""
+    print("Testing bulk signature verification...")
+    
+    from app.models import transaction as transaction_module
+    from app.models.key_cache import verified_signatures
+    from app.models.transaction import Transaction, verify_signatures
+    from app.models.util import b64encode
+    from app.models.wallet import Wallet
+    
+    wallet = Wallet()
+    pubkey = b64encode(wallet.public_key.to_string())
+    transactions = []
+    for i in range(6):
+        tx = Transaction(wallet.get_address, pubkey, f"receiver{i}", i)
+        tx.sign(wallet)
+        transactions.append(tx)
+    transactions[2].amount = 500  # Signature no longer matches
+    expected = [True, True, False, True, True, True]
+    
+    verified_signatures.clear()
+    assert verify_signatures(transactions) == expected, "In-process results differ"
+    print("[PASS] In-process bulk verification")
+    
+    verified_signatures.clear()
+    min_transactions = transaction_module.PARALLEL_VERIFY_MIN_TRANSACTIONS
+    transaction_module.PARALLEL_VERIFY_MIN_TRANSACTIONS = 2
+    try:
+        assert verify_signatures(transactions, workers=2) == expected, "Parallel results differ"
+    finally:
+        transaction_module.PARALLEL_VERIFY_MIN_TRANSACTIONS = min_transactions
+    assert verified_signatures.stats()["entries"] == 5, "Parallel successes were not cached"
+    assert transactions[0].verify_signature() and verified_signatures.hits >= 1, "Cached success not reused"
+    print("[PASS] Parallel bulk verification fills the cache")
+    
+    print("[SUCCESS] All bulk signature verification tests passed!\n")
+
+if __name__ == "__main__":
+    try:
+        test_public_key_cache()
+        test_key_pool()
+        test_signature_cache()
+        test_bulk_signature_verification()
+        print("=" * 50)
+        print("ALL TESTS PASSED SUCCESSFULLY!")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n[FAIL] TEST FAILED: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[ERROR] {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)